@@ -0,0 +1,66 @@
+import streamlit as st
+
+from salarycalc.timing import MAX_RERUNS, clear, memory_tracing, recent_reruns, set_memory_tracing, stage_frame
+
+# --- Page Setup ---
+st.set_page_config(page_title="Diagnostics", layout="wide")
+st.title("🩺 Diagnostics")
+st.caption(f"Stage timings of the last {MAX_RERUNS} page reruns in this app process (newest first).")
+
+# --- Controls ---
+col1, col2 = st.columns(2)
+with col1:
+    trace_memory = st.toggle(
+        "Measure peak memory per stage", value=memory_tracing(),
+        help="Uses tracemalloc, which slows every page down while it is on."
+    )
+    if trace_memory != memory_tracing():
+        set_memory_tracing(trace_memory)
+with col2:
+    if st.button("🗑️ Clear Recorded Reruns"):
+        clear()
+
+stages = stage_frame()
+if stages.empty:
+    st.info("No reruns recorded yet. Open the other pages and come back here.")
+    st.stop()
+
+# --- Recent Reruns ---
+st.markdown("### 🕒 Recent Reruns")
+reruns = []
+for rerun in recent_reruns():
+    slowest = max(rerun.stages, key=lambda record: record.seconds, default=None)
+    reruns.append({
+        "Rerun": rerun.number,
+        "Page": rerun.page,
+        "Started": rerun.started,
+        "Seconds": rerun.seconds,
+        "Stages": " · ".join(f"{record.name} {record.seconds:.3f}s" for record in rerun.stages),
+        "Slowest Stage": slowest.name if slowest else "",
+    })
+st.dataframe(reruns, use_container_width=True, hide_index=True, column_config={
+    "Seconds": st.column_config.NumberColumn(format="%.3f"),
+})
+
+# --- Slowest Stages ---
+st.markdown("### 🐢 Slowest Stages")
+st.dataframe(
+    stages.nlargest(20, "Seconds"), use_container_width=True, hide_index=True,
+    column_config={"Seconds": st.column_config.NumberColumn(format="%.4f"),
+                   "Peak MB": st.column_config.NumberColumn(format="%.2f")},
+)
+
+# --- Per Page and Stage ---
+st.markdown("### 📊 By Page and Stage")
+by_stage = stages.groupby(["Page", "Stage"]).agg(
+    Runs=("Seconds", "size"),
+    Mean=("Seconds", "mean"),
+    P95=("Seconds", lambda seconds: seconds.quantile(0.95)),
+    Max=("Seconds", "max"),
+    Rows=("Rows", "max"),
+    Peak_MB=("Peak MB", "max"),
+).rename(columns={"Peak_MB": "Peak MB"}).sort_values("P95", ascending=False).reset_index()
+st.dataframe(
+    by_stage, use_container_width=True, hide_index=True,
+    column_config={col: st.column_config.NumberColumn(format="%.4f") for col in ["Mean", "P95", "Max"]},
+)
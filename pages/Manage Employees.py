@@ -3,32 +3,21 @@ import streamlit as st
 import pandas as pd
 import os
 
+from salarycalc.data import EMPLOYEE_FILE, journal_upsert, load_attendance_names, load_employees
+from salarycalc.timing import begin_rerun, stage
+
 # --- Page Setup ---
 st.set_page_config(page_title="Manage Employees")
+begin_rerun("Manage Employees")
 st.title("👤 Manage Employee Settings")
 
-# File paths
-os.makedirs("data", exist_ok=True)
-attendance_cache_path = "data/attendance_processed.csv"
-employee_data_file = "data/employee_data.csv"
-
 # Load existing employee data
-if os.path.exists(employee_data_file) and os.path.getsize(employee_data_file) > 0:
-    employee_df = pd.read_csv(employee_data_file)
-else:
-    employee_df = pd.DataFrame(columns=[
-        "Employee Name", "Employee Type", "EPF No", "Basic Salary",
-        "BRA", "Salary for EPF",  # <-- ADD THESE LINES
-        "Normal Pay Rate", "Normal Pay Hourly Rate", "Overtime Pay Hourly Rate",
-        "Sunday Pay Rate", "Attendance Bonus", "Other Allowances", "Meal Allowance",
-        "EPF 8%", "EPF 12%", "ETF 3%"
-    ])
-# Load employee names from attendance file
-if os.path.exists(attendance_cache_path):
-    attendance_df = pd.read_csv(attendance_cache_path)
-    employee_names = sorted(attendance_df['Name'].dropna().unique())
-else:
-    employee_names = sorted(employee_df["Employee Name"].unique())
+os.makedirs("data", exist_ok=True)
+with stage("load") as timed:
+    employee_df = load_employees()
+    # Load employee names from attendance file
+    employee_names = load_attendance_names() or sorted(employee_df["Employee Name"].unique())
+    timed.rows = len(employee_df)
 
 # Employee Types and Presets with explicit float values
 employee_type_presets = {
@@ -122,7 +111,7 @@ if employee_names:
     st.markdown(f"**📌 ETF 3% (Employer):** Rs. `{etf_3}`")
 
     if st.button("💾 Save Employee Data"):
-        new_record = pd.DataFrame([{
+        new_record = {
             "Employee Name": selected_employee,
             "Employee Type": employee_type,
             "EPF No": epf_no,
@@ -139,11 +128,9 @@ if employee_names:
             "EPF 8%": epf_8,
             "EPF 12%": epf_12,
             "ETF 3%": etf_3
-        }])
+        }
 
-        employee_df = employee_df[employee_df["Employee Name"] != selected_employee]
-        employee_df = pd.concat([employee_df, new_record], ignore_index=True)
-        employee_df.to_csv(employee_data_file, index=False)
+        journal_upsert(EMPLOYEE_FILE, [new_record])
         st.success(f"✅ Salary data saved for {selected_employee}")
 else:
     st.warning("⚠️ No employee names available. Upload an attendance CSV first.")
@@ -4,19 +4,19 @@ import os
 import calendar
 from datetime import date
 
+from salarycalc.data import HOLIDAY_FILE, journal_delete, journal_sync, journal_upsert, load_holidays
+from salarycalc.timing import begin_rerun, stage
+
 # Setup
 st.set_page_config(page_title="Manage Holidays")
+begin_rerun("Manage Holidays")
 st.title("📅 Manage Holidays")
 
-# Paths
-os.makedirs("data", exist_ok=True)
-holiday_file_path = "data/holidays.csv"
-
 # Load holiday data
-if os.path.exists(holiday_file_path) and os.path.getsize(holiday_file_path) > 0:
-    holidays_df = pd.read_csv(holiday_file_path, parse_dates=["Holiday Date"])
-else:
-    holidays_df = pd.DataFrame(columns=["Holiday Date", "Holiday Name", "Year", "Month"])
+os.makedirs("data", exist_ok=True)
+with stage("load") as timed:
+    holidays_df = load_holidays().sort_values("Holiday Date", ignore_index=True)
+    timed.rows = len(holidays_df)
 
 # --- Add New Holiday ---
 st.subheader("➕ Add New Holiday")
@@ -28,15 +28,16 @@ with col2:
     new_name = st.text_input("Holiday Name")
 
 if st.button("Add Holiday"):
-    new_entry = pd.DataFrame([{
+    new_entry = {
         "Holiday Date": pd.to_datetime(new_date),
         "Holiday Name": new_name,
         "Year": new_date.year,
         "Month": calendar.month_name[new_date.month]
-    }])
-    holidays_df = pd.concat([holidays_df, new_entry], ignore_index=True).drop_duplicates(subset=["Holiday Date"])
-    holidays_df.sort_values("Holiday Date", inplace=True)
-    holidays_df.to_csv(holiday_file_path, index=False)
+    }
+    # An existing holiday on that date is kept
+    if not (holidays_df["Holiday Date"] == new_entry["Holiday Date"]).any():
+        journal_upsert(HOLIDAY_FILE, [new_entry])
+        holidays_df = load_holidays().sort_values("Holiday Date", ignore_index=True)
     st.success(f"✅ Holiday added: {new_name} on {new_date.strftime('%Y-%m-%d')}")
 
 # --- Manage Existing Holidays ---
@@ -51,12 +52,14 @@ else:
     editable_df["Holiday Date"] = editable_df["Holiday Date"].dt.strftime("%Y-%m-%d")
 
     # Show day of week in the data editor (read-only for user)
-    updated_df = st.data_editor(
-        editable_df[["Holiday Date", "Day of Week", "Holiday Name"]],
-        num_rows="dynamic",
-        use_container_width=True,
-        key="holiday_editor"
-    )
+    with stage("render editor") as timed:
+        updated_df = st.data_editor(
+            editable_df[["Holiday Date", "Day of Week", "Holiday Name"]],
+            num_rows="dynamic",
+            use_container_width=True,
+            key="holiday_editor"
+        )
+        timed.rows = len(editable_df)
 
     if st.button("💾 Save Changes"):
         updated_df["Holiday Date"] = pd.to_datetime(updated_df["Holiday Date"], errors='coerce')
@@ -65,7 +68,7 @@ else:
         # Drop the Day of Week column before saving
         updated_df = updated_df.drop(columns=["Day of Week"])
         updated_df.drop_duplicates(subset=["Holiday Date"], inplace=True)
-        updated_df.to_csv(holiday_file_path, index=False)
+        journal_sync(HOLIDAY_FILE, holidays_df, updated_df)
         st.success("✅ Holidays updated successfully.")
 
     st.divider()
@@ -79,7 +82,6 @@ else:
             st.write(f"🏷️ {row['Holiday Name']}")
         with col3:
             if st.button("Delete", key=f"del_{index}"):
-                holidays_df = holidays_df.drop(index)
-                holidays_df.to_csv(holiday_file_path, index=False)
+                journal_delete(HOLIDAY_FILE, [row])
                 st.success(f"🗑️ Deleted holiday on {row['Holiday Date'].strftime('%Y-%m-%d')}")
                 st.rerun()
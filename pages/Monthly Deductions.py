@@ -1,58 +1,35 @@
 import streamlit as st
-import pandas as pd
 import os
 import calendar
 from datetime import date
 from dateutil.relativedelta import relativedelta
 
+from salarycalc.data import ATTENDANCE_FILE, load_attendance_names
+from salarycalc.deductions import DeductionStore
+from salarycalc.timing import begin_rerun, stage
+
 # --- Page Setup ---
 st.set_page_config(page_title="Monthly Deductions")
+begin_rerun("Monthly Deductions")
 st.title("📉 Monthly Deductions")
 
-# File paths
-os.makedirs("data", exist_ok=True)
-deductions_file = "data/monthly_deductions.csv"
-attendance_cache_path = "data/attendance_processed.csv"
-
 # Load data
-deductions_df = pd.read_csv(deductions_file) if os.path.exists(deductions_file) else pd.DataFrame(columns=[
-    "Employee Name", "Year", "Month", "Monthly Advanced", "Monthly Loan Deduction"
-])
+os.makedirs("data", exist_ok=True)
+with stage("load") as timed:
+    store = DeductionStore.load()
+    deductions_df = store.to_frame()
+    timed.rows = len(deductions_df)
 
 # Load employee list
-if os.path.exists(attendance_cache_path):
+if os.path.exists(ATTENDANCE_FILE):
     try:
-        attendance_df = pd.read_csv(attendance_cache_path)
-        employee_names = sorted(attendance_df['Name'].dropna().unique())
+        employee_names = load_attendance_names()
         st.success(f"✅ Loaded {len(employee_names)} employee(s).")
     except:
         employee_names = sorted(deductions_df["Employee Name"].dropna().unique())
 else:
     employee_names = sorted(deductions_df["Employee Name"].dropna().unique())
 
-# --- Utility: Merge/Upsert Helper ---
-def upsert_deduction(df, name, year, month, advance, loan):
-    mask = (
-        (df["Employee Name"] == name) &
-        (df["Year"] == year) &
-        (df["Month"] == month)
-    )
-    if mask.any():
-        if advance is not None:
-            df.loc[mask, "Monthly Advanced"] = advance
-        if loan is not None:
-            df.loc[mask, "Monthly Loan Deduction"] = loan
-    else:
-        new_row = pd.DataFrame([{
-            "Employee Name": name,
-            "Year": year,
-            "Month": month,
-            "Monthly Advanced": advance if advance is not None else 0.0,
-            "Monthly Loan Deduction": loan if loan is not None else 0.0
-        }])
-        df = pd.concat([df, new_row], ignore_index=True)
-    return df
-
 # --- Deduction Form ---
 st.subheader("🧾 Set Monthly Deductions")
 
@@ -68,23 +45,14 @@ if employee_names:
         adv_month = st.selectbox("Advance Month", list(calendar.month_name)[1:], index=date.today().month - 1, key="adv_month")
 
     # Get existing advance for this employee/month
-    existing_adv = deductions_df[
-        (deductions_df["Employee Name"] == selected_employee) &
-        (deductions_df["Year"] == adv_year) &
-        (deductions_df["Month"] == adv_month)
-    ]
-    adv_val = float(existing_adv["Monthly Advanced"].values[0]) if not existing_adv.empty else 0.0
-    curr_loan = float(existing_adv["Monthly Loan Deduction"].values[0]) if not existing_adv.empty else 0.0
+    adv_val, _ = store.get(selected_employee, adv_year, adv_month)
     advance_amount = st.number_input("Monthly Advanced", min_value=0.0, value=adv_val, key="advance_input")
 
     if st.button("💾 Save Advance"):
-        deductions_df = upsert_deduction(
-            deductions_df,
-            selected_employee, adv_year, adv_month,
-            advance_amount,
-            curr_loan  # keep loan as is
-        )
-        deductions_df.to_csv(deductions_file, index=False)
+        with stage("save advance"):
+            store.upsert(selected_employee, adv_year, adv_month, advance=advance_amount)  # keep loan as is
+            store.flush()
+        deductions_df = store.to_frame()
         st.success(f"✅ Saved advance for {selected_employee} in {adv_month} {adv_year}.")
 
     st.divider()
@@ -123,24 +91,16 @@ if employee_names:
     st.info(f"Loan Duration: **{loan_duration} month(s)**")
 
     if st.button("💾 Save Loan"):
-        for i in range(loan_duration):
-            entry_date = start_month + relativedelta(months=i)
-            year = entry_date.year
-            month = calendar.month_name[entry_date.month]
-            # Get any current advance for this month (to preserve both)
-            exist_row = deductions_df[
-                (deductions_df["Employee Name"] == selected_employee) &
-                (deductions_df["Year"] == year) &
-                (deductions_df["Month"] == month)
-            ]
-            curr_advance = float(exist_row["Monthly Advanced"].values[0]) if not exist_row.empty else 0.0
-            deductions_df = upsert_deduction(
-                deductions_df,
-                selected_employee, year, month,
-                curr_advance,
-                loan_amount
+        # One batch for the whole term; any current advance is preserved
+        loan_months = (start_month + relativedelta(months=i) for i in range(loan_duration))
+        with stage("save loan") as timed:
+            store.upsert_many(
+                (selected_employee, entry_date.year, calendar.month_name[entry_date.month], None, loan_amount)
+                for entry_date in loan_months
             )
-        deductions_df.to_csv(deductions_file, index=False)
+            store.flush()
+            timed.rows = loan_duration
+        deductions_df = store.to_frame()
         st.success(
             f"✅ Saved loan deduction(s) for {selected_employee} from {start_month.strftime('%B %Y')} to {end_month.strftime('%B %Y')}."
         )
@@ -165,10 +125,12 @@ if not deductions_df.empty:
         filtered = filtered[filtered["Employee Name"] == filter_employee]
 
     if not filtered.empty:
-        st.dataframe(
-            filtered.sort_values(by=["Employee Name", "Year", "Month"]),
-            use_container_width=True
-        )
+        with stage("render table") as timed:
+            st.dataframe(
+                filtered.sort_values(by=["Employee Name", "Year", "Month"]),
+                use_container_width=True
+            )
+            timed.rows = len(filtered)
 
         # --- THEME-FRIENDLY DEDUCTION TOTALS SUMMARY ---
         total_advance = filtered["Monthly Advanced"].sum()
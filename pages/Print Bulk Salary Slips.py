@@ -1,96 +1,31 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import os
 import calendar
-from datetime import date, datetime
+import os
+from datetime import date
+
+from salarycalc.data import load_deductions, load_employees, load_holidays, master_token
+from salarycalc.payroll import compute_payroll
+from salarycalc.prefetch import BackgroundCache
+from salarycalc.slips import PRINT_ALL_BUTTON, document, payroll_records, render_slip_sets
+from salarycalc.store import load_month_summary, summary_token
+from salarycalc.timing import begin_rerun, stage
+
+try:
+    from salarycalc.slip_pdf import render_slips_pdf
+except ImportError:  # reportlab not installed
+    render_slips_pdf = None
 
 # --- PAGE SETUP ---
 st.set_page_config(page_title="Bulk Salary Slips", layout="wide")
+begin_rerun("Print Bulk Salary Slips")
 st.title("🖨️ Bulk Print Salary Slips")
 
-# --- GLOBAL STYLE BLOCK ---
-STYLE_BLOCK = """
-<style>
-    .slip-set {
-        display: inline-block;
-        width: 5.2cm;
-        min-width: 5.2cm;
-        max-width: 5.3cm;
-        vertical-align: top;
-        margin: 0 0.4cm 20px 0.4cm;
-    }
-    .slip {
-        width: 5cm;
-        height: auto;
-        padding: 8px;
-        border: 1px solid #ccc;
-        border-radius: 6px;
-        font-size: 11px;
-        margin-bottom: 20px;
-        font-family: 'Segoe UI', 'Helvetica Neue', sans-serif;
-        box-shadow: 0 1px 4px rgba(0,0,0,0.1);
-        background: white;
-        box-sizing: border-box;
-    }
-    .slip h3, .slip h5 {
-        text-align: center;
-        margin: 6px 0;
-        font-size: 13px;
-        font-weight: 600;
-    }
-    .slip table {
-        width: 100%;
-        border-collapse: collapse;
-    }
-    .slip td {
-        padding: 2px 0;
-        vertical-align: top;
-    }
-    .slip hr {
-        border: none;
-        border-top: 1px solid #ddd;
-        margin: 6px 0;
-    }
-    .net-box {
-        border-top: 2px solid #000;
-        padding-top: 4px;
-        font-weight: bold;
-        font-size: 12px;
-    }
-    .print-button { margin-bottom:20px; }
-    @media print {
-        .print-button { display: none; }
-        .slip-set { page-break-inside: avoid; }
-        body { background:white !important; }
-    }
-    body { background:white !important; }
-</style>
-"""
-
-# --- FILE PATHS ---
-employee_file = "data/employee_data.csv"
-deduction_file = "data/monthly_deductions.csv"
-summary_root_folder = "data/monthly_summary"
-holiday_file = "data/holidays.csv"
-
 # --- LOAD DATA ---
-def load_data(path, empty_cols):
-    if os.path.exists(path) and os.path.getsize(path) > 0:
-        return pd.read_csv(path)
-    else:
-        return pd.DataFrame(columns=empty_cols)
-
-employee_df = load_data(employee_file, [
-    "Employee Name", "Employee Type", "EPF No", "Basic Salary",
-    "BRA", "Salary for EPF", "Normal Pay Rate", "Normal Pay Hourly Rate",
-    "Overtime Pay Hourly Rate", "Sunday Pay Rate", "Attendance Bonus",
-    "Other Allowances", "Meal Allowance", "EPF 8%", "EPF 12%", "ETF 3%"
-])
-deduction_df = load_data(deduction_file,
-    ["Employee Name", "Year", "Month", "Monthly Advanced", "Monthly Loan Deduction"])
-holidays_df = load_data(holiday_file, ["Holiday Date", "Holiday Name", "Year", "Month"])
-holidays_df['Holiday Date'] = pd.to_datetime(holidays_df['Holiday Date'], errors='coerce')
+with stage("load"):
+    employee_df = load_employees()
+    deduction_df = load_deductions()
+    holidays_df = load_holidays()
 
 # --- UI ---
 employee_types = sorted(employee_df["Employee Type"].dropna().unique())
@@ -105,222 +40,104 @@ with col1:
 with col2:
     selected_month = st.selectbox("Month", list(calendar.month_name)[1:], index=date.today().month - 1)
 
-month_num = list(calendar.month_name).index(selected_month)
-
-# --- SALARY SLIP RENDER (structure identical to Print Salary Slips.py) ---
-def render_salary_slip(
-    selected_employee, emp_data, summary_df, deduction_df,
-    selected_year, selected_month, month_num, holidays_df
-):
-    normal_rate = emp_data["Normal Pay Rate"].values[0]
-    overtime_hourly = emp_data["Overtime Pay Hourly Rate"].values[0]
-    sunday_rate = emp_data["Sunday Pay Rate"].values[0]
-    bonus_raw = emp_data["Attendance Bonus"].values[0]
-    other_allow = emp_data["Other Allowances"].values[0]
-    meal = emp_data["Meal Allowance"].values[0]
-    epf_no = emp_data["EPF No"].values[0] if "EPF No" in emp_data else "N/A"
-    basic_salary = emp_data["Basic Salary"].values[0]
-    bra = emp_data["BRA"].values[0]
-    salary_for_epf = emp_data["Salary for EPF"].values[0]
-    epf_8 = round(salary_for_epf * 0.08, 2)
-    epf_12 = round(salary_for_epf * 0.12, 2)
-    etf_3 = round(salary_for_epf * 0.03, 2)
-
-    summary_df['Day'] = summary_df['Day'].astype(str)
-
-    def classify_real_day(att):
-        if att > 6.5:
-            return 1.0
-        elif 0 < att <= 6.5:
-            return 0.5
-        return 0.0
-
-    if 'ATT_Time' not in summary_df.columns and 'Work Time' in summary_df.columns:
-        def time_to_float(tstr):
-            try:
-                h, m = map(int, str(tstr).split(":"))
-                return round(h + m / 60, 2)
-            except:
-                return 0
-        summary_df['ATT_Time'] = summary_df['Work Time'].apply(time_to_float)
-    if 'RND(ATT_Time)' not in summary_df.columns:
-        summary_df['RND(ATT_Time)'] = summary_df['ATT_Time'].round().astype(int)
-    summary_df['Real Day'] = summary_df['RND(ATT_Time)'].apply(classify_real_day)
-
-    if 'OT Time' not in summary_df.columns:
-        if 'Clock Out' in summary_df.columns:
-            def calc_ot(row):
-                try:
-                    out = str(row['Clock Out']).strip()
-                    if out in ["", "0", "00:00", "nan", "NaN"]:
-                        return 0
-                    out_time = datetime.strptime(out, "%H:%M")
-                    std_out = datetime.strptime("17:00", "%H:%M")
-                    if out_time > std_out:
-                        return round((out_time - std_out).seconds / 3600)
-                    return 0
-                except:
-                    return 0
-            summary_df['OT Time'] = summary_df.apply(calc_ot, axis=1)
-        else:
-            summary_df['OT Time'] = 0
-
-    weekday_full = summary_df[(summary_df['Day'].str.lower() != 'sunday') & (summary_df['Real Day'] == 1.0)]
-    weekday_half = summary_df[(summary_df['Day'].str.lower() != 'sunday') & (summary_df['Real Day'] == 0.5)]
-    sunday_full = summary_df[(summary_df['Day'].str.lower() == 'sunday') & (summary_df['Real Day'] == 1.0)]
-    sunday_half = summary_df[(summary_df['Day'].str.lower() == 'sunday') & (summary_df['Real Day'] == 0.5)]
-
-    weekday_overtime = summary_df[summary_df['Day'].str.lower() != 'sunday']['OT Time'].sum()
-
-    filtered_holidays = holidays_df[
-        (holidays_df['Year'] == selected_year) & (holidays_df['Month'] == selected_month)
-    ]
-    govt_holiday_dates = set(filtered_holidays['Holiday Date'].dt.date.dropna())
-
-    total_days = calendar.monthrange(selected_year, month_num)[1]
-    all_dates = pd.date_range(f"{selected_year}-{month_num:02d}-01", periods=total_days)
-    total_sundays = sum(1 for d in all_dates if d.day_name() == "Sunday")
-    total_weekdays = total_days - total_sundays
-    govt_weekday_holidays = sum(1 for d in govt_holiday_dates if pd.to_datetime(d).day_name() not in ["Saturday", "Sunday"])
-    bonus_threshold = total_weekdays - govt_weekday_holidays - 2
-    bonus = bonus_raw if len(weekday_full) >= bonus_threshold else 0
-
-    emp_deductions = deduction_df[
-        (deduction_df["Employee Name"] == selected_employee) &
-        (deduction_df["Year"] == selected_year) &
-        (deduction_df["Month"] == selected_month)
-    ]
-    monthly_advance = emp_deductions["Monthly Advanced"].values[0] if not emp_deductions.empty else 0
-    monthly_loan = emp_deductions["Monthly Loan Deduction"].values[0] if not emp_deductions.empty else 0
-
-    # ---- Managerial Override ----
-    emp_type = emp_data["Employee Type"].values[0]
-    if emp_type in ["Employee (ORIN)", "Employee (Nescafe)", "Employee (Siyallanka)"]:
-        base_salary = salary_for_epf
-        sunday_pay = 0
-        ot_pay = 0
-        bonus = bonus_raw
-        gross = base_salary + bonus + other_allow + meal
-        net = gross - monthly_advance - monthly_loan - epf_8
-        # For neatness in slip display:
-        weekday_full = []
-        weekday_half = []
-        sunday_full = []
-        sunday_half = []
-        weekday_overtime = 0
-    else:
-        base_salary = (len(weekday_full) * normal_rate) + (len(weekday_half) * normal_rate / 2)
-        sunday_pay = (len(sunday_full) * sunday_rate) + (len(sunday_half) * sunday_rate / 2)
-        ot_pay = weekday_overtime * overtime_hourly
-        gross = base_salary + ot_pay + sunday_pay + bonus + other_allow + meal
-        net = gross - monthly_advance - monthly_loan - epf_8
-
-    # --- Both formats (unchanged) ---
-    format1 = f"""
-        <div class='slip'>
-            <table>
-                <tr><td><strong>Employee</strong></td><td align='right'><strong>{selected_employee}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>Salary per Day</td><td align='right'>{normal_rate:,.2f}</td></tr>
-                <tr><td>Full Days</td><td align='right'>{len(weekday_full)}</td></tr>
-                <tr><td>Half Days</td><td align='right'>{len(weekday_half)}</td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Base Salary</strong></td><td align='right'><strong>{base_salary:,.2f}</strong></td></tr>
-                <tr><td>OT ({weekday_overtime:.2f} × {overtime_hourly})</td><td align='right'>{ot_pay:,.2f}</td></tr>
-                <tr><td>Sunday Pay</td><td align='right'>{sunday_pay:,.2f}</td></tr>
-                <tr><td>Attendance Bonus</td><td align='right'>{bonus:,.2f}</td></tr>
-                <tr><td>Other Allowances</td><td align='right'>{other_allow:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Gross Salary</strong></td><td align='right'><strong>{gross:,.2f}</strong></td></tr>
-                <tr><td>Meal Allowance</td><td align='right'>{meal:,.2f}</td></tr>
-                <tr><td>Advance</td><td align='right'>{monthly_advance:,.2f}</td></tr>
-                <tr><td>Loan</td><td align='right'>{monthly_loan:,.2f}</td></tr>
-                <tr><td>EPF 8%</td><td align='right'>{epf_8:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table class='net-box'>
-                <tr><td><strong>Net Salary</strong></td><td align='right'><strong>{net:,.2f}</strong></td></tr>
-            </table>
-        </div>
-        """
-
-    format2 = f"""
-        <div class='slip'>
-            <h3>Darshana Enterprises</h3>
-            <table>
-                <tr><td>{selected_month} - {selected_year}</td><td align='right'>EPF No: <strong>{epf_no}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Employee</strong></td><td align='right'><strong>{selected_employee}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>Basic Salary</td><td align='right'>{basic_salary:,.2f}</td></tr>
-                <tr><td>BRA</td><td align='right'>{bra:,.2f}</td></tr>
-            </table>
-            <hr style="border-top: 1px dashed #888;">
-            <table>
-                <tr><td><strong>Salary For EPF</strong></td><td align='right'><strong>{salary_for_epf:,.2f}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>OT ({weekday_overtime:.2f} × {overtime_hourly})</td><td align='right'>{ot_pay:,.2f}</td></tr>
-                <tr><td>Sunday Pay</td><td align='right'>{sunday_pay:,.2f}</td></tr>
-                <tr><td>Attendance Bonus</td><td align='right'>{bonus:,.2f}</td></tr>
-                <tr><td>Other Allowances</td><td align='right'>{other_allow:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Gross Salary</strong></td><td align='right'><strong>{gross:,.2f}</strong></td></tr>
-                <tr><td>Meal Allowance</td><td align='right'>{meal:,.2f}</td></tr>
-                <tr><td>Advance</td><td align='right'>{monthly_advance:,.2f}</td></tr>
-                <tr><td>Loan</td><td align='right'>{monthly_loan:,.2f}</td></tr>
-                <tr><td>EPF 8%</td><td align='right'>{epf_8:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table class='net-box'>
-                <tr><td><strong>Net Salary</strong></td><td align='right'><strong>{net:,.2f}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>EPF 12%</td><td align='right'>{epf_12:,.2f}</td></tr>
-                <tr><td>ETF 3%</td><td align='right'>{etf_3:,.2f}</td></tr>
-            </table>
-        </div>
-        """
-    return f"<div class='slip-set'>{format1}{format2}</div>"
-
-# --- RENDER ALL SELECTED EMPLOYEES, 3 SETS PER ROW ---
-html_blocks = []
-for idx, emp_name in enumerate(selected_employees):
-    emp_data = employee_df[employee_df["Employee Name"] == emp_name]
-    summary_path = f"{summary_root_folder}/{selected_year}/{selected_month}/{emp_name}_{selected_month}_{selected_year}.csv"
-    if not os.path.exists(summary_path) or emp_data.empty:
-        continue
-    summary_df = pd.read_csv(summary_path)
-    html_blocks.append(render_salary_slip(emp_name, emp_data, summary_df, deduction_df, selected_year, selected_month, month_num, holidays_df))
-
-print_btn = """<div class='print-button' style='margin-bottom:20px;'>
-<a href="javascript:window.print()" style="padding:8px 20px; background:#28a745; color:white; text-decoration:none; border-radius:4px; font-size:16px;">🖨️ Print All</a></div>
-"""
+SETS_PER_ROW = 3
+SETS_PER_PAGE = 9
 
 # --- GROUP 3 SETS PER ROW FOR PRINT LAYOUT ---
-rows = []
-for i in range(0, len(html_blocks), 3):
-    row = "<div style='width:100%; display:flex; flex-direction:row; justify-content:space-between; margin-bottom:10px;'>"
-    for j in range(3):
-        if i + j < len(html_blocks):
-            row += html_blocks[i + j]
-    row += "</div>"
-    rows.append(row)
-final_html = STYLE_BLOCK + print_btn + ''.join(rows)
+def render_slip_rows(payroll_df, names, selected_year, selected_month):
+    payroll_by_employee = payroll_df.drop_duplicates("Employee Name").set_index("Employee Name", drop=False)
+    records = payroll_records(payroll_by_employee.loc[list(names)], selected_year, selected_month)
+    return render_slip_sets(records, SETS_PER_ROW)
+
+
+def render_page(names, month_summary, deduction_df, holidays_df, employee_df, selected_year, selected_month):
+    """Compute and render the slip sets of one page only (runs on the prefetch thread too)."""
+    page_payroll = compute_payroll(
+        employee_df[employee_df["Employee Name"].astype(str).isin(names)],
+        month_summary, deduction_df, holidays_df, selected_year, selected_month
+    )
+    return render_slip_rows(page_payroll, names, selected_year, selected_month)
+
+
+@st.cache_resource
+def slip_page_cache():
+    """One page cache for every session; keys carry the data token, so sessions never see stale pages."""
+    return BackgroundCache(max_entries=64)
+
+
+def slip_height(n_sets):
+    return min(1800, 400 * ((n_sets + SETS_PER_ROW - 1) // SETS_PER_ROW))
+
+
+# --- EMPLOYEES WITH A SUMMARY THIS MONTH ---
+with stage("load summaries") as timed:
+    month_summary = load_month_summary(selected_year, selected_month)
+    timed.rows = len(month_summary)
+summary_names = set(month_summary["Name"].astype(str))
+slip_names = list(dict.fromkeys(
+    str(emp_name) for emp_name in selected_employees if str(emp_name) in summary_names
+))
+
+if not slip_names:
+    st.warning("⚠️ No salary summaries found for the selected employees. Please export them from 'Attendance Dashboard'.")
+    st.stop()
+
+
+def full_payroll():
+    payroll_df = compute_payroll(
+        employee_df[employee_df["Employee Name"].astype(str).isin(slip_names)],
+        month_summary, deduction_df, holidays_df, selected_year, selected_month
+    )
+    return payroll_df.drop_duplicates("Employee Name").set_index("Employee Name", drop=False).loc[slip_names]
+
+
+# --- PDF DOWNLOAD (rendered server-side, written to disk) ---
+if render_slips_pdf is None:
+    st.info("Install `reportlab` to download the slips as a PDF.")
+elif st.button("📄 Generate PDF"):
+    progress = st.progress(0.0, text="Rendering slips...")
+    with stage("render pdf") as timed:
+        pdf_path = render_slips_pdf(
+            full_payroll(), selected_year, selected_month,
+            on_progress=lambda done, total: progress.progress(done / total, text=f"Rendered {done}/{total} slips")
+        )
+        timed.rows = len(slip_names)
+    progress.empty()
+    with open(pdf_path, "rb") as pdf_file:
+        st.download_button("⬇️ Download PDF", pdf_file, file_name=os.path.basename(pdf_path), mime="application/pdf")
+
+view_mode = st.radio("View", ["Paged", "Print All"], horizontal=True)
 
 # --- OUTPUT ---
-components.html(final_html, height=min(1800, 400 * ((len(html_blocks)+2)//3)), scrolling=True)
+if view_mode == "Print All":
+    with stage("compute") as timed:
+        payroll_df = full_payroll()
+        timed.rows = len(payroll_df)
+    with stage("render") as timed:
+        final_html = document(PRINT_ALL_BUTTON + render_slip_rows(payroll_df, slip_names, selected_year, selected_month))
+        components.html(final_html, height=slip_height(len(slip_names)), scrolling=True)
+        timed.rows = len(slip_names)
+else:
+    total_pages = (len(slip_names) + SETS_PER_PAGE - 1) // SETS_PER_PAGE
+    page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, step=1)
+
+    slip_pages = slip_page_cache()
+
+    # Pages are keyed on the file signatures of their inputs, so an edited deduction or summary renders afresh
+    data_token = (master_token(), summary_token(selected_year, selected_month))
+    render_args = (month_summary, deduction_df, holidays_df, employee_df, selected_year, selected_month)
+
+    def page_names(number):
+        return tuple(slip_names[(number - 1) * SETS_PER_PAGE:number * SETS_PER_PAGE])
+
+    def page_key(number):
+        return (selected_year, selected_month, page_names(number), data_token)
+
+    with stage("compute and render page") as timed:
+        page_html = slip_pages.get(page_key(page), render_page, page_names(page), *render_args)
+        timed.rows = len(page_names(page))
+    if page < total_pages:
+        slip_pages.prefetch(page_key(page + 1), render_page, page_names(page + 1), *render_args)
+
+    st.caption(f"Showing {len(page_names(page))} of {len(slip_names)} employees. Use 'Print All' to print every slip.")
+    components.html(document(page_html), height=slip_height(len(page_names(page))), scrolling=True)
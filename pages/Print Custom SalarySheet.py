@@ -1,7 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
 
+from salarycalc.slips import CUSTOM_FORMAT2, FORMAT1, PRINT_ALL_BUTTON, document, render_slips
+from salarycalc.timing import begin_rerun, stage
+
 st.set_page_config(page_title="Custom Salary Slips", layout="wide")
+begin_rerun("Print Custom SalarySheet")
 st.title("📝 Custom Salary Slips (Manual Entry)")
 
 if "custom_sheets" not in st.session_state:
@@ -66,165 +70,56 @@ if st.session_state.custom_sheets:
         st.markdown(f"- {emp['name']} ({emp['designation']})")
         if st.button(f"❌ Remove {emp['name']}", key=f"del_{i}"):
             st.session_state.custom_sheets.pop(i)
-            st.st.rerun()
-()
+            st.rerun()
+
+# --- HTML RENDER (same templates as Print Salary Slips) ---
+CUSTOM_CSS = """
+    .slip hr {
+        border-top: 1px dotted #888 !important;
+    }
+"""
 
-# --- HTML RENDER (exact same structure as your Print Salary Slips) ---
 def render_salary_slip(emp):
     # For manual entry, no attendance stats, so all are zeroed for display
-    full_days = 0
-    half_days = 0
-    sunday_full = 0
-    sunday_half = 0
-    weekday_overtime = 0
-    ot_pay = 0
-    sunday_pay = 0
     base_salary = emp["salary_for_epf"]  # Show as Salary for EPF for manual sheets
-    bonus = emp["bonus"]
-    other_allow = emp["other_allow"]
-    meal = emp["meal"]
-    gross = base_salary + bonus + other_allow + meal
-    monthly_advance = emp["advance"]
-    monthly_loan = emp["loan"]
-    epf_8 = emp["epf_8"]
-    epf_12 = emp["epf_12"]
-    etf_3 = emp["etf_3"]
-    net = gross - monthly_advance - monthly_loan - epf_8
-
-    style = """
-        <style>
-            .slip {
-                width: 5cm;
-                height: auto;
-                padding: 8px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-                font-size: 11px;
-                margin-bottom: 20px;
-                font-family: 'Segoe UI', 'Helvetica Neue', sans-serif;
-                box-shadow: 0 1px 4px rgba(0,0,0,0.1);
-            }
-            .slip h3, .slip h5 {
-                text-align: center;
-                margin: 6px 0;
-                font-size: 13px;
-                font-weight: 600;
-            }
-            .slip table {
-                width: 100%;
-                border-collapse: collapse;
-            }
-            .slip td {
-                padding: 2px 0;
-                vertical-align: top;
-            }
-            .slip hr {
-                border: none;
-                border-top: 1px dotted #888 !important;
-                margin: 6px 0;
-            }
-            .net-box {
-                border-top: 2px solid #000;
-                padding-top: 4px;
-                font-weight: bold;
-                font-size: 12px;
-            }
-            @media print {
-                .print-button { display: none; }
-            }
-        </style>
-        """
-
-    format1 = f"""
-        <div class='slip'>
-            <table>
-                <tr><td><strong>Employee</strong></td><td align='right'><strong>{emp['name']}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>Salary per Day</td><td align='right'>{emp['normal_rate']:,.2f}</td></tr>
-                <tr><td>Full Days</td><td align='right'>{full_days}</td></tr>
-                <tr><td>Half Days</td><td align='right'>{half_days}</td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Base Salary</strong></td><td align='right'><strong>{base_salary:,.2f}</strong></td></tr>
-                <tr><td>OT ({weekday_overtime:.2f} × {emp['overtime_hourly']})</td><td align='right'>{ot_pay:,.2f}</td></tr>
-                <tr><td>Sunday Pay</td><td align='right'>{sunday_pay:,.2f}</td></tr>
-                <tr><td>Attendance Bonus</td><td align='right'>{bonus:,.2f}</td></tr>
-                <tr><td>Other Allowances</td><td align='right'>{other_allow:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Gross Salary</strong></td><td align='right'><strong>{gross:,.2f}</strong></td></tr>
-                <tr><td>Meal Allowance</td><td align='right'>{meal:,.2f}</td></tr>
-                <tr><td>Advance</td><td align='right'>{monthly_advance:,.2f}</td></tr>
-                <tr><td>Loan</td><td align='right'>{monthly_loan:,.2f}</td></tr>
-                <tr><td>EPF 8%</td><td align='right'>{epf_8:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table class='net-box'>
-                <tr><td><strong>Net Salary</strong></td><td align='right'><strong>{net:,.2f}</strong></td></tr>
-            </table>
-        </div>
-        """
-
-    format2 = f"""
-        <div class='slip'>
-            <h3>Darshana Enterprises</h3>
-            <table>
-                <tr><td><strong>Employee</strong></td><td align='right'><strong>{emp['name']}</strong></td></tr>
-                <tr><td>Designation</td><td align='right'>{emp['designation']}</td></tr>
-                <tr><td>EPF No:</td><td align='right'><b>{emp['epf_no']}</b></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>Basic Salary</td><td align='right'>{emp['basic_salary']:,.2f}</td></tr>
-                <tr><td>BRA</td><td align='right'>{emp['bra']:,.2f}</td></tr>
-            </table>
-            <hr style="border-top: 1px dashed #888;">
-            <table>
-                <tr><td><strong>Salary For EPF</strong></td><td align='right'><strong>{emp['salary_for_epf']:,.2f}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>OT ({weekday_overtime:.2f} × {emp['overtime_hourly']})</td><td align='right'>{ot_pay:,.2f}</td></tr>
-                <tr><td>Sunday Pay</td><td align='right'>{sunday_pay:,.2f}</td></tr>
-                <tr><td>Attendance Bonus</td><td align='right'>{bonus:,.2f}</td></tr>
-                <tr><td>Other Allowances</td><td align='right'>{other_allow:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td><strong>Gross Salary</strong></td><td align='right'><strong>{gross:,.2f}</strong></td></tr>
-                <tr><td>Meal Allowance</td><td align='right'>{meal:,.2f}</td></tr>
-                <tr><td>Advance</td><td align='right'>{monthly_advance:,.2f}</td></tr>
-                <tr><td>Loan</td><td align='right'>{monthly_loan:,.2f}</td></tr>
-                <tr><td>EPF 8%</td><td align='right'>{epf_8:,.2f}</td></tr>
-            </table>
-            <hr>
-            <table class='net-box'>
-                <tr><td><strong>Net Salary</strong></td><td align='right'><strong>{net:,.2f}</strong></td></tr>
-            </table>
-            <hr>
-            <table>
-                <tr><td>EPF 12%</td><td align='right'>{epf_12:,.2f}</td></tr>
-                <tr><td>ETF 3%</td><td align='right'>{etf_3:,.2f}</td></tr>
-            </table>
-        </div>
-        """
-    return style + f"""
+    gross = base_salary + emp["bonus"] + emp["other_allow"] + emp["meal"]
+    record = {
+        "employee": emp["name"],
+        "designation": emp["designation"],
+        "epf_no": emp["epf_no"],
+        "normal_rate": emp["normal_rate"],
+        "full_days": 0,
+        "half_days": 0,
+        "weekday_overtime": 0,
+        "overtime_hourly": emp["overtime_hourly"],
+        "basic_salary": emp["basic_salary"],
+        "bra": emp["bra"],
+        "salary_for_epf": emp["salary_for_epf"],
+        "base_salary": base_salary,
+        "ot_pay": 0,
+        "sunday_pay": 0,
+        "bonus": emp["bonus"],
+        "other_allow": emp["other_allow"],
+        "meal": emp["meal"],
+        "gross": gross,
+        "advance": emp["advance"],
+        "loan": emp["loan"],
+        "epf_8": emp["epf_8"],
+        "epf_12": emp["epf_12"],
+        "etf_3": emp["etf_3"],
+        "net": gross - emp["advance"] - emp["loan"] - emp["epf_8"],
+    }
+    return f"""
         <div style="display:flex; flex-direction:row; gap:20px; margin-bottom:30px;">
-            {format1}{format2}
+            {render_slips(record, (FORMAT1, CUSTOM_FORMAT2))}
         </div>
     """
 
 # --- PRINT ALL SHEETS TOGETHER ---
 if st.session_state.custom_sheets:
     st.markdown("## 🖨️ Custom Salary Slips")
-    slips_html = ''.join([render_salary_slip(emp) for emp in st.session_state.custom_sheets])
-    slips_html += """
-    <div class='print-button' style='margin-bottom:20px;'>
-        <a href="javascript:window.print()" style="padding:8px 20px; background:#28a745; color:white; text-decoration:none; border-radius:4px; font-size:16px;">🖨️ Print All</a>
-    </div>
-    """
-    components.html(slips_html, height=700 + len(st.session_state.custom_sheets)*340, scrolling=True)
+    with stage("render") as timed:
+        slips_html = document(''.join(render_salary_slip(emp) for emp in st.session_state.custom_sheets) + PRINT_ALL_BUTTON,
+                              extra_css=CUSTOM_CSS)
+        components.html(slips_html, height=700 + len(st.session_state.custom_sheets)*340, scrolling=True)
+        timed.rows = len(st.session_state.custom_sheets)
@@ -0,0 +1,99 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import calendar
+
+from salarycalc.data import load_attendance_slices, load_holidays
+from salarycalc.timing import begin_rerun, stage
+from salarycalc.workcalendar import month_calendar
+from salarycalc.workforce import TOTAL_LABELS, flat_pivot, month_pivot
+
+# --- Page Setup ---
+st.set_page_config(page_title="Workforce Attendance", layout="wide")
+begin_rerun("Workforce Attendance")
+st.title("👥 Workforce Attendance")
+
+HOLIDAY_STYLE = 'background-color: yellow'
+SUNDAY_STYLE = 'background-color: gainsboro'
+FULL_DAY_STYLE = 'background-color: lightgreen'
+HALF_DAY_STYLE = 'background-color: khaki'
+ABSENT_STYLE = 'background-color: salmon'
+OT_STYLE = 'background-color: lightskyblue'
+VIEWS = {"Real Days": "Real Day", "OT Hours": "OT Time"}
+
+# --- Load Data ---
+with stage("load"):
+    holidays_df = load_holidays()
+    slices = load_attendance_slices()
+
+if not slices:
+    st.info("No attendance uploaded yet. Upload it on the Attendance Dashboard first.")
+    st.stop()
+
+# --- UI ---
+years = sorted({year for _, year, _ in slices})
+col1, col2, col3 = st.columns(3)
+with col1:
+    selected_year = st.selectbox("Year", years, index=len(years) - 1)
+with col2:
+    months = [month for month in calendar.month_name[1:] if any(
+        year == selected_year and slice_month == month for _, year, slice_month in slices
+    )]
+    selected_month = st.selectbox("Month", months, index=len(months) - 1)
+with col3:
+    view = st.radio("Show", list(VIEWS), horizontal=True)
+value = VIEWS[view]
+
+# --- Employees x Days Pivot (cached per month) ---
+with stage("pivot") as timed:
+    pivot = month_pivot(selected_year, selected_month)
+    timed.rows = len(pivot)
+
+if pivot.empty:
+    st.warning(f"No attendance for {selected_month} {selected_year}.")
+    st.stop()
+
+cal = month_calendar(selected_year, selected_month, holidays_df)
+days = list(range(1, cal["total_days"] + 1))
+is_holiday = np.array([bool(cal["holiday_mask"] >> (day - 1) & 1) for day in days])
+is_sunday = np.array([bool(cal["sunday_mask"] >> (day - 1) & 1) for day in days])
+day_cols = [str(day) for day in days]
+table = pivot[value].rename(columns=str)
+
+
+def heatmap_styles(table):
+    values = table[day_cols].to_numpy()
+    if value == "Real Day":
+        styles = np.select([values >= 1, values > 0, is_sunday], [FULL_DAY_STYLE, HALF_DAY_STYLE, SUNDAY_STYLE],
+                           ABSENT_STYLE)
+    else:
+        styles = np.where(values > 0, OT_STYLE, np.where(is_sunday, SUNDAY_STYLE, ''))
+    # Holidays are coloured whole-column, like on the dashboard
+    styles = np.where(is_holiday, HOLIDAY_STYLE, styles)
+    css = pd.DataFrame(styles, index=table.index, columns=day_cols)
+    css[TOTAL_LABELS[value]] = 'font-weight: bold'
+    return css[table.columns]
+
+
+st.markdown(f"### 🗓️ {view} - {selected_month} {selected_year}")
+st.caption("Yellow: holiday · Grey: Sunday · Green: full day · Khaki: half day · Salmon: absent · Blue: overtime")
+with stage("render") as timed:
+    st.dataframe(
+        table.style.apply(heatmap_styles, axis=None).format("{:g}"),
+        use_container_width=True, height=min(35 * (len(table) + 1) + 3, 800),
+    )
+    timed.rows = len(table)
+
+# --- Totals ---
+col1, col2, col3 = st.columns(3)
+col1.metric("Employees", len(pivot))
+col2.metric("Real Days", f"{pivot[('Real Day', TOTAL_LABELS['Real Day'])].sum():g}")
+col3.metric("OT Hours", f"{pivot[('OT Time', TOTAL_LABELS['OT Time'])].sum():,}")
+
+# --- Export ---
+st.download_button(
+    "⬇️ Download Pivot (CSV)",
+    flat_pivot(pivot).to_csv(index=False).encode("utf-8"),
+    file_name=f"workforce_attendance_{selected_month}_{selected_year}.csv",
+    mime="text/csv",
+)
@@ -0,0 +1,5 @@
+import sys
+
+from salarycalc.cli import main
+
+sys.exit(main())
@@ -0,0 +1,142 @@
+"""Materialized per-employee-month payroll aggregates.
+
+One row per employee per month with the worked days, OT hours and the
+payroll amounts ``compute_payroll`` gives for that month, kept in
+data/payroll_aggregates.csv (or the ``payroll_aggregates`` table with
+``SALARYCALC_STORE=sqlite``). Year-to-date and multi-month reports read this
+table instead of every monthly summary.
+
+Each month's rows carry an ``Inputs`` token built from the month's summaries
+(``store.summary_token``), the employee master and that month's deductions
+and holidays. ``load_aggregates`` recomputes only the months whose token no
+longer matches, so exporting a month or editing its inputs refreshes just
+that month on the next read.
+"""
+import calendar
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from salarycalc import db
+from salarycalc.data import cached_read, load_deductions, load_employees, load_holidays, save_csv
+from salarycalc.payroll import compute_payroll
+from salarycalc.store import load_month_summary, summary_token
+
+AGGREGATE_FILE = "data/payroll_aggregates.csv"
+AGGREGATE_TABLE = "payroll_aggregates"
+
+AGGREGATE_KEY = ["Employee Name", "Year", "Month"]
+AGGREGATE_VALUE_COLS = [
+    "Worked Days", "Full Days", "Half Days", "Sunday Full", "Sunday Half", "Absent Days", "Weekday OT Hours",
+    "Base Salary", "OT Pay", "Sunday Pay", "Bonus", "Gross Salary", "Advance", "Loan",
+    "EPF 8%", "Net Salary", "EPF 12%", "ETF 3%",
+]
+AGGREGATE_COLS = AGGREGATE_KEY + ["Employee Type", "Department"] + AGGREGATE_VALUE_COLS + ["Inputs"]
+_AMOUNT_COLS = AGGREGATE_VALUE_COLS[AGGREGATE_VALUE_COLS.index("Base Salary"):]
+
+MONTHS = list(calendar.month_name)[1:]
+
+_lock = threading.Lock()
+
+
+def _frame_hash(df):
+    return pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes()
+
+
+def inputs_token(year, month, employee_df, deduction_df, holidays_df, summaries=None):
+    """Token of everything one month's aggregates are computed from.
+
+    ``summaries`` is the month's ``summary_token`` if the caller already has it.
+    """
+    summaries = summary_token(year, month) if summaries is None else summaries
+    digest = hashlib.sha1(summaries.encode())
+    digest.update(_frame_hash(employee_df))
+    digest.update(_frame_hash(deduction_df[(deduction_df["Year"] == year) & (deduction_df["Month"] == month)]))
+    digest.update(_frame_hash(holidays_df[(holidays_df["Year"] == year) & (holidays_df["Month"] == month)]))
+    return digest.hexdigest()[:16]
+
+
+def month_aggregates(year, month, employee_df, deduction_df, holidays_df, token=""):
+    """Aggregate rows for the employees with attendance in one month."""
+    month_summary = load_month_summary(year, month)
+    if month_summary.empty:
+        return pd.DataFrame(columns=AGGREGATE_COLS)
+    payroll_df = compute_payroll(employee_df, month_summary, deduction_df, holidays_df, year, month)
+    rows = payroll_df[payroll_df["Has Summary"]].assign(Year=int(year), Month=month, Inputs=token)
+    return rows.reindex(columns=AGGREGATE_COLS).reset_index(drop=True)
+
+
+def _ensure_table(conn):
+    db.ensure_table(conn, AGGREGATE_TABLE, AGGREGATE_COLS, key=AGGREGATE_KEY, indexes=[["Year", "Month"]],
+                    real_cols=_AMOUNT_COLS, text_cols=["Inputs"])
+
+
+def _read_aggregates(path):
+    return pd.read_csv(path, dtype={"Inputs": str})
+
+
+def _read_year(year):
+    if db.enabled():
+        return db.read_table(AGGREGATE_TABLE, AGGREGATE_COLS, 'WHERE "Year" = ?', (int(year),))
+    if not os.path.exists(AGGREGATE_FILE):
+        return pd.DataFrame(columns=AGGREGATE_COLS)
+    aggregates = cached_read(AGGREGATE_FILE, _read_aggregates)
+    return aggregates[aggregates["Year"] == int(year)].reset_index(drop=True)
+
+
+def _replace_months(year, refreshed):
+    """Replace the stored rows of each refreshed month of ``year`` with its new rows."""
+    rows = pd.concat(list(refreshed.values()), ignore_index=True).reindex(columns=AGGREGATE_COLS)
+    if db.enabled():
+        with db.transaction() as conn:
+            _ensure_table(conn)
+            db.delete(conn, AGGREGATE_TABLE, ["Year", "Month"], [(int(year), month) for month in refreshed])
+            db.insert(conn, AGGREGATE_TABLE, AGGREGATE_COLS, db.rows_of(rows, AGGREGATE_COLS))
+        return
+
+    stored = cached_read(AGGREGATE_FILE, _read_aggregates) if os.path.exists(AGGREGATE_FILE) else None
+    if stored is not None:
+        stale = (stored["Year"] == int(year)) & stored["Month"].isin(list(refreshed))
+        rows = pd.concat([stored[~stale], rows], ignore_index=True) if not rows.empty else stored[~stale]
+    save_csv(rows.reindex(columns=AGGREGATE_COLS), AGGREGATE_FILE)
+
+
+def load_aggregates(year, months=None):
+    """Aggregate rows of ``year`` for ``months`` (default: all), in month then name order.
+
+    Months whose summaries or master inputs changed since they were stored
+    are recomputed and written back first.
+    """
+    months = [month for month in MONTHS if months is None or month in months]
+    employee_df, deduction_df, holidays_df = load_employees(), load_deductions(), load_holidays()
+    with _lock:
+        stored = _read_year(year)
+        stored_tokens = stored.groupby("Month")["Inputs"].first().to_dict() if not stored.empty else {}
+        refreshed = {}
+        for month in months:
+            summaries = summary_token(year, month)
+            if not summaries and month not in stored_tokens:
+                continue
+            token = inputs_token(year, month, employee_df, deduction_df, holidays_df, summaries)
+            if stored_tokens.get(month) != token:
+                refreshed[month] = month_aggregates(year, month, employee_df, deduction_df, holidays_df, token)
+        if refreshed:
+            _replace_months(year, refreshed)
+            stored = _read_year(year)
+
+    selected = stored[stored["Month"].isin(months)].copy()
+    selected["Month"] = pd.Categorical(selected["Month"], categories=MONTHS, ordered=True)
+    selected = selected.sort_values(["Month", "Employee Name"]).reset_index(drop=True)
+    selected["Month"] = selected["Month"].astype(str)
+    return selected
+
+
+def period_totals(aggregates_df, by):
+    """``AGGREGATE_VALUE_COLS`` sums over a period, one row per value of ``by``, plus a month count."""
+    grouped = aggregates_df.groupby(by, dropna=False)
+    totals = grouped[AGGREGATE_VALUE_COLS].sum()
+    totals.insert(0, "Months", grouped["Month"].nunique())
+    return totals.reset_index()
+
@@ -0,0 +1,225 @@
+"""Columnar attendance normalization.
+
+Derives ATT_Time, RND(ATT_Time), OT Time and Real Day for a whole attendance
+frame in one pass, using vectorized string parsing instead of a row-wise
+``apply`` with ``datetime.strptime``.
+
+``compact_attendance`` gives loaded attendance its typed schema: Name, Day
+and Month are categoricals, Clock In/Clock Out/Work Time are nullable int16
+minutes, Absent is bool and Year is int16. ``normalize_attendance`` accepts
+either the typed or the "HH:MM" text form; ``attendance_text`` turns a typed
+frame back into the file's text form.
+
+Loaded attendance is sorted by ``SLICE_KEYS`` so every (Name, Year, Month)
+slice is a contiguous run of rows; ``slice_offsets`` maps each slice to its
+``(start, stop)`` positions for ``df.iloc[start:stop]``.
+"""
+import calendar
+
+import numpy as np
+import pandas as pd
+
+# --- Working Day Rules ---
+STD_IN_MINUTES = 8 * 60     # 08:00
+STD_OUT_MINUTES = 17 * 60   # 17:00
+FULL_DAY_HOURS = 6.5
+
+SUMMARY_COLS = ['Date', 'Name', 'Day', 'Work Time', 'Clock In', 'Clock Out', 'Absent', 'ATT_Time',
+                'RND(ATT_Time)', 'OT Time', 'Real Day']
+
+ATTENDANCE_COLUMNS = ['AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out', 'Absent', 'Work Time']
+TIME_COLS = ['Clock In', 'Clock Out', 'Work Time']
+SLICE_KEYS = ['Name', 'Year', 'Month']
+STATUS_HOLIDAY, STATUS_ABSENT, STATUS_PRESENT = 'holiday', 'absent', 'present'
+DAY_NAMES = list(calendar.day_name)
+MONTH_NAMES = list(calendar.month_name)[1:]
+
+_BLANKS = ["", "nan", "NaN"]
+_DURATION_RE = r"^(\d+):(\d+)$"
+_CLOCK_RE = r"^(\d{1,2}):(\d{1,2})$"
+
+
+def _text(series):
+    return series.fillna("").astype(str).str.strip()
+
+
+def _column(df, name, default):
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def duration_to_minutes(series):
+    """Parse "H:MM" durations (e.g. Work Time) to minutes; unparseable values become NaN."""
+    parts = _text(series).str.extract(_DURATION_RE).astype(float)
+    return parts[0] * 60 + parts[1]
+
+
+def clock_to_minutes(series):
+    """Parse "HH:MM" clock times to minutes since midnight; invalid times become NaN."""
+    parts = _text(series).str.extract(_CLOCK_RE).astype(float)
+    valid = (parts[0] <= 23) & (parts[1] <= 59)
+    return (parts[0] * 60 + parts[1]).where(valid)
+
+
+def minutes_to_text(minutes):
+    """Format minutes as zero-padded "HH:MM"; missing values stay missing."""
+    minutes = pd.to_numeric(minutes)
+    whole = minutes.fillna(0).astype(int)
+    text = (whole // 60).astype(str).str.zfill(2) + ":" + (whole % 60).astype(str).str.zfill(2)
+    return text.astype(object).where(minutes.notna())
+
+
+def _minutes(series, parse):
+    """Minutes (float, NaN for blanks) from either typed minutes or "HH:MM" text."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    return parse(series)
+
+
+def compact_attendance(df):
+    """``df`` with the typed attendance schema applied (Day, Year and Month derived from Date)."""
+    out = df.copy()
+    if 'AC-No.' in out.columns:
+        out['AC-No.'] = pd.to_numeric(out['AC-No.'], errors='coerce').astype('Int32')
+    out['Name'] = out['Name'].astype('category')
+    for col, parse in [('Clock In', clock_to_minutes), ('Clock Out', clock_to_minutes),
+                       ('Work Time', duration_to_minutes)]:
+        if col in out.columns:
+            out[col] = _minutes(out[col], parse).round().astype('Int16')
+    if 'Absent' in out.columns:
+        out['Absent'] = out['Absent'].astype(str).str.strip().str.lower().isin(['true', '1'])
+    out['Day'] = pd.Categorical(out['Date'].dt.day_name(), categories=DAY_NAMES)
+    out['Year'] = out['Date'].dt.year.astype('int16')
+    out['Month'] = pd.Categorical(out['Date'].dt.month_name(), categories=MONTH_NAMES)
+    return out
+
+
+def sort_slices(df):
+    """``df`` stably sorted by ``SLICE_KEYS`` (rows keep their order within a slice), with a fresh index."""
+    return df.sort_values(SLICE_KEYS, kind='stable').reset_index(drop=True)
+
+
+def slice_offsets(df):
+    """``{(name, year, month): (start, stop)}`` row positions of a frame sorted by ``sort_slices``."""
+    sizes = df.groupby(SLICE_KEYS, sort=False, observed=True).size()
+    stops = sizes.to_numpy().cumsum()
+    return {
+        (name, int(year), month): (int(stop - size), int(stop))
+        for (name, year, month), size, stop in zip(sizes.index, sizes.to_numpy(), stops)
+    }
+
+
+def attendance_text(df):
+    """A typed attendance frame in the file's text form ("HH:MM" times, Absent "True" or blank)."""
+    out = df.copy()
+    for col in TIME_COLS:
+        if col in out.columns and pd.api.types.is_numeric_dtype(out[col]):
+            out[col] = minutes_to_text(out[col])
+    if 'Absent' in out.columns:
+        out['Absent'] = _absent_text(out['Absent'])
+    return out
+
+
+def _absent_text(series):
+    if pd.api.types.is_bool_dtype(series):
+        return pd.Series(np.where(series, "True", None), index=series.index, dtype=object)
+    return series
+
+
+def fix_clock_columns(clock_in, clock_out):
+    """Default a missing Clock In to 08:00 and a missing Clock Out to 17:00; both missing -> 00:00."""
+    clock_in = _text(clock_in)
+    clock_out = _text(clock_out)
+    in_blank = clock_in.isin(_BLANKS)
+    out_blank = clock_out.isin(_BLANKS)
+    both_blank = in_blank & out_blank
+
+    clock_in = clock_in.mask(both_blank, "00:00").mask(in_blank & ~out_blank, "08:00")
+    clock_out = clock_out.mask(both_blank, "00:00").mask(out_blank & ~in_blank, "17:00")
+    return clock_in, clock_out
+
+
+def _typed_minutes(out, fill_clock_defaults):
+    """``fix_clock_columns`` for typed minute columns; writes the text form back into ``out``."""
+    in_minutes = out['Clock In'].astype(float)
+    out_minutes = out['Clock Out'].astype(float)
+    if fill_clock_defaults:
+        in_minutes = in_minutes.fillna(STD_IN_MINUTES)
+        out_minutes = out_minutes.fillna(STD_OUT_MINUTES)
+    in_blank = in_minutes.isna()
+    out_blank = out_minutes.isna()
+    both_blank = in_blank & out_blank
+    in_minutes = in_minutes.mask(both_blank, 0).mask(in_blank & ~out_blank, STD_IN_MINUTES)
+    out_minutes = out_minutes.mask(both_blank, 0).mask(out_blank & ~in_blank, STD_OUT_MINUTES)
+
+    work_minutes = out['Work Time'].astype(float)
+    out['Clock In'] = minutes_to_text(in_minutes)
+    out['Clock Out'] = minutes_to_text(out_minutes)
+    out['Work Time'] = minutes_to_text(work_minutes).fillna("0:00")
+    if 'Absent' in out.columns:
+        out['Absent'] = _absent_text(out['Absent'])
+    return in_minutes, out_minutes, work_minutes
+
+
+def day_status(df, holiday_dates):
+    """Holiday, absent or present for every row of ``df`` (a holiday wins over an absence).
+
+    ``holiday_dates`` is a set of dates; Absent may be bool or "True" text.
+    """
+    is_holiday = df['Date'].dt.normalize().isin(pd.to_datetime(list(holiday_dates)))
+    absent = df['Absent']
+    is_absent = absent if pd.api.types.is_bool_dtype(absent) else _text(absent).str.lower() == 'true'
+    return pd.Series(
+        np.select([is_holiday, is_absent], [STATUS_HOLIDAY, STATUS_ABSENT], STATUS_PRESENT),
+        index=df.index,
+    )
+
+
+def classify_real_day(att_hours):
+    """1.0 for more than 6.5 hours, 0.5 for any time up to that, else 0.0."""
+    return pd.Series(
+        np.select([att_hours > FULL_DAY_HOURS, att_hours > 0], [1.0, 0.5], 0.0),
+        index=att_hours.index,
+    )
+
+
+def normalize_attendance(df, fill_clock_defaults=True, real_day_from="ATT_Time", late_early=False):
+    """Return a copy of ``df`` with the derived payroll columns added.
+
+    ``fill_clock_defaults`` fills missing Clock In/Out with 08:00/17:00 before
+    the blank check (the Save All behaviour); otherwise a row with neither
+    punch gets 00:00/00:00. ``real_day_from`` picks ATT_Time or RND(ATT_Time)
+    as the Real Day basis, and ``late_early`` adds the Late (hr) and Early (hr)
+    columns shown on the dashboard.
+    """
+    out = df.copy()
+
+    if all(col in out.columns and pd.api.types.is_numeric_dtype(out[col]) for col in TIME_COLS):
+        in_minutes, out_minutes, work_minutes = _typed_minutes(out, fill_clock_defaults)
+    else:
+        clock_in = _column(out, 'Clock In', "08:00")
+        clock_out = _column(out, 'Clock Out', "17:00")
+        if fill_clock_defaults:
+            clock_in = clock_in.fillna("08:00")
+            clock_out = clock_out.fillna("17:00")
+        out['Clock In'], out['Clock Out'] = fix_clock_columns(clock_in, clock_out)
+        out['Work Time'] = _column(out, 'Work Time', "0:00").fillna("0:00")
+
+        work_minutes = duration_to_minutes(out['Work Time'])
+        in_minutes = clock_to_minutes(out['Clock In'])
+        out_minutes = clock_to_minutes(out['Clock Out'])
+
+    out['ATT_Time'] = (work_minutes / 60).round(2).fillna(0)
+    out['RND(ATT_Time)'] = out['ATT_Time'].round().astype(int)
+
+    if late_early:
+        late = (in_minutes - STD_IN_MINUTES).clip(lower=0)
+        early = (STD_OUT_MINUTES - out_minutes).clip(lower=0).where(out_minutes != 0)
+        out['Late (hr)'] = (late / 60).round(2).fillna(0)
+        out['Early (hr)'] = (early / 60).round(2).fillna(0)
+
+    overtime = (out_minutes - STD_OUT_MINUTES).clip(lower=0)
+    out['OT Time'] = (overtime / 60).round().fillna(0).astype(int)
+    out['Real Day'] = classify_real_day(out[real_day_from])
+    return out
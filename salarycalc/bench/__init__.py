@@ -0,0 +1,8 @@
+"""Synthetic-data benchmarks for ingestion, payroll calculation and slip rendering.
+
+    python -m salarycalc bench --scales 25x1,100x3,250x6 --output bench.json
+
+Each scale (employees x months) gets a fresh data/ folder generated by
+``synthetic.generate_dataset``; ``suite.run_suite`` times every stage on it
+and writes a JSON report.
+"""
@@ -0,0 +1,167 @@
+"""Timed benchmark stages over generated data.
+
+Every scale runs in its own temporary folder (the data paths are relative to
+the working directory) through the same functions the pages call:
+
+- ``load_attendance``: parse attendance_processed.csv (Home.py on upload)
+- ``export_summaries``: Home.py's "Save All" (attendance file plus every monthly summary)
+- ``calculate_per_employee``: Salary Calculation, one employee-month at a time
+- ``calculate_month``: ``compute_payroll`` for all employees of each month
+- ``render_slips_html``: the bulk slip page's "Print All" document for each month
+
+Stage times are the best of ``repeat`` runs.
+"""
+import datetime
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from salarycalc.bench.synthetic import generate_dataset
+from salarycalc.data import (
+    ATTENDANCE_FILE, invalidate, load_attendance, load_deductions, load_employees, load_holidays,
+)
+from salarycalc.incremental import clear_manifest, save_changed_summaries
+from salarycalc.payroll import compute_payroll
+from salarycalc.slips import PRINT_ALL_BUTTON, document, payroll_records, render_slip_sets
+from salarycalc.store import active_backend, clear_summaries, load_employee_summary, load_month_summary
+
+DEFAULT_SCALES = [(25, 1), (100, 3), (250, 6)]
+
+
+def parse_scales(text):
+    """``"25x1,100x3"`` -> ``[(25, 1), (100, 3)]`` (employees x months)."""
+    scales = []
+    for part in text.split(","):
+        employees, _, months = part.strip().lower().partition("x")
+        scales.append((int(employees), int(months or 1)))
+    return scales
+
+
+def _best_of(repeat, fn):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _stage(seconds, rows):
+    return {
+        "seconds": round(seconds, 6),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+        "us_per_row": round(seconds / rows * 1e6, 3) if rows else None,
+    }
+
+
+def _load_attendance():
+    invalidate(ATTENDANCE_FILE)
+    return load_attendance()
+
+
+def _export(df, workers):
+    clear_summaries()
+    clear_manifest()
+    return save_changed_summaries(df, force=True, workers=workers)
+
+
+def _calculate_per_employee(periods, employee_df, deduction_df, holidays_df):
+    computed = 0
+    for year, month in periods:
+        for _, emp_data in employee_df.groupby("Employee Name", sort=False):
+            summary_df = load_employee_summary(emp_data["Employee Name"].iloc[0], year, month)
+            if summary_df is not None:
+                compute_payroll(emp_data, summary_df, deduction_df, holidays_df, year, month)
+                computed += 1
+    return computed
+
+
+def _calculate_months(periods, employee_df, deduction_df, holidays_df):
+    return {
+        (year, month): compute_payroll(
+            employee_df, load_month_summary(year, month), deduction_df, holidays_df, year, month
+        )
+        for year, month in periods
+    }
+
+
+def _render_slips(payrolls):
+    html_bytes, slips = 0, 0
+    for (year, month), payroll_df in payrolls.items():
+        paid = payroll_df[payroll_df["Has Summary"]].sort_values("Employee Name")
+        html_bytes += len(document(PRINT_ALL_BUTTON + render_slip_sets(payroll_records(paid, year, month))))
+        slips += len(paid)
+    return slips, html_bytes
+
+
+def run_scale(employees, months, repeat=1, workers=1, seed=0):
+    """Generate one dataset in a temporary folder and time every stage on it."""
+    root = tempfile.mkdtemp(prefix="salarycalc-bench-")
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        invalidate()
+        start = time.perf_counter()
+        dataset = generate_dataset(root, employees, months, seed=seed)
+        generate_seconds = time.perf_counter() - start
+        periods = dataset.pop("periods")
+        rows = dataset["attendance_rows"]
+
+        stages = {}
+        seconds, df = _best_of(repeat, _load_attendance)
+        stages["load_attendance"] = _stage(seconds, rows)
+        seconds, _ = _best_of(repeat, lambda: _export(df, workers))
+        stages["export_summaries"] = _stage(seconds, rows)
+
+        inputs = (load_employees(), load_deductions(), load_holidays())
+        seconds, computed = _best_of(repeat, lambda: _calculate_per_employee(periods, *inputs))
+        stages["calculate_per_employee"] = _stage(seconds, computed)
+        seconds, payrolls = _best_of(repeat, lambda: _calculate_months(periods, *inputs))
+        stages["calculate_month"] = _stage(seconds, employees * months)
+        seconds, (slips, html_bytes) = _best_of(repeat, lambda: _render_slips(payrolls))
+        stages["render_slips_html"] = {**_stage(seconds, slips), "html_bytes": html_bytes}
+
+        return {**dataset, "generate_seconds": round(generate_seconds, 6), "stages": stages}
+    finally:
+        os.chdir(cwd)
+        invalidate()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "backend": active_backend(),
+    }
+
+
+def run_suite(scales=DEFAULT_SCALES, repeat=1, workers=1, seed=0, on_result=None):
+    """The benchmark report for every ``(employees, months)`` scale, as a JSON-ready dict.
+
+    ``on_result(result)`` is called after each scale finishes.
+    """
+    results = []
+    for employees, months in scales:
+        result = run_scale(employees, months, repeat=repeat, workers=workers, seed=seed)
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "repeat": repeat,
+        "workers": workers,
+        "seed": seed,
+        "results": results,
+    }
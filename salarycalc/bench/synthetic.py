@@ -0,0 +1,188 @@
+"""Synthetic payroll data in the app's file formats.
+
+``generate_dataset`` writes data/attendance_processed.csv (the device export
+schema, DD/MM/YYYY dates) with matching employee, deduction and holiday
+files for ``employees`` x ``months``. Output is deterministic for a seed.
+"""
+import calendar
+import os
+
+import numpy as np
+import pandas as pd
+
+from salarycalc.data import (
+    ATTENDANCE_DATE_FORMAT, ATTENDANCE_FILE, DEDUCTION_COLS, DEDUCTION_FILE, EMPLOYEE_COLS, EMPLOYEE_FILE,
+    HOLIDAY_COLS, HOLIDAY_FILE,
+)
+from salarycalc.payroll import EPF_EMPLOYEE_RATE, EPF_EMPLOYER_RATE, ETF_RATE, FIXED_SALARY_TYPES
+
+ATTENDANCE_COLS = ["AC-No.", "Name", "Date", "On duty", "Off duty", "Clock In", "Clock Out", "Real time",
+                   "Late", "Early", "Absent", "OT Time", "Work Time", "ATT_Time"]
+ATTENDANCE_TYPE = "Working Staff (BULB)"
+FIXED_SHARE = 0.15
+
+ON_DUTY = 8 * 60
+OFF_DUTY = 17 * 60
+FULL_DAY_MINUTES = 390
+
+# Chance of an absence by kind of day
+ABSENT_WEEKDAY = 0.08
+ABSENT_SATURDAY = 0.15
+ABSENT_SUNDAY = 0.8
+ABSENT_HOLIDAY = 0.9
+HALF_DAY = 0.05
+OVERTIME = 0.45
+
+
+def month_periods(months, start_year=2025, start_month=1):
+    """``months`` consecutive ``(year, month name)`` pairs from the start month."""
+    periods = []
+    for i in range(months):
+        year, month_index = divmod(start_month - 1 + i, 12)
+        periods.append((start_year + year, calendar.month_name[month_index + 1]))
+    return periods
+
+
+def _month_days(year, month):
+    month_num = list(calendar.month_name).index(month)
+    return pd.date_range(f"{year}-{month_num:02d}-01", periods=calendar.monthrange(year, month_num)[1])
+
+
+def _hhmm(minutes):
+    minutes = pd.Series(minutes).astype(int)
+    return (minutes // 60).astype(str).str.zfill(2) + ":" + (minutes % 60).astype(str).str.zfill(2)
+
+
+def _blank_unless(mask, values):
+    return values.where(pd.Series(mask), "")
+
+
+def make_employees(employees, rng):
+    basic = rng.choice([22000.0, 24000.0, 26000.0, 30000.0], size=employees)
+    bra = np.full(employees, 3000.0)
+    salary_for_epf = basic + bra
+    types = np.where(
+        rng.random(employees) < FIXED_SHARE, rng.choice(FIXED_SALARY_TYPES, size=employees), ATTENDANCE_TYPE
+    )
+    normal_rate = (salary_for_epf / 25).round()
+    return pd.DataFrame({
+        "Employee Name": [f"Employee {i:05d}" for i in range(1, employees + 1)],
+        "Employee Type": types,
+        "EPF No": np.arange(1001, 1001 + employees),
+        "Basic Salary": basic,
+        "BRA": bra,
+        "Salary for EPF": salary_for_epf,
+        "Normal Pay Rate": normal_rate,
+        "Normal Pay Hourly Rate": (normal_rate / 8).round().astype(int),
+        "Overtime Pay Hourly Rate": (normal_rate / 8 * 1.5).round().astype(int),
+        "Sunday Pay Rate": normal_rate * 1.5,
+        "Attendance Bonus": np.where(types == ATTENDANCE_TYPE, 1500.0, 0.0),
+        "Other Allowances": rng.choice([0.0, 0.0, 1000.0, 2500.0], size=employees),
+        "Meal Allowance": rng.choice([0.0, 0.0, 1500.0], size=employees),
+        "EPF 8%": salary_for_epf * EPF_EMPLOYEE_RATE,
+        "EPF 12%": salary_for_epf * EPF_EMPLOYER_RATE,
+        "ETF 3%": salary_for_epf * ETF_RATE,
+    })[EMPLOYEE_COLS]
+
+
+def make_holidays(periods, rng):
+    rows = []
+    for year, month in periods:
+        month_num = list(calendar.month_name).index(month)
+        # A full-moon (poya) holiday every month, and now and then a second holiday
+        days = [int(rng.integers(5, 16))]
+        if rng.random() < 0.3:
+            days.append(int(rng.integers(17, 28)))
+        for day in days:
+            rows.append({
+                "Holiday Date": f"{year}-{month_num:02d}-{day:02d}",
+                "Holiday Name": "POYA DAY" if day == days[0] else "PUBLIC HOLIDAY",
+                "Year": year,
+                "Month": month,
+            })
+    return pd.DataFrame(rows, columns=HOLIDAY_COLS)
+
+
+def make_deductions(employee_df, periods, rng):
+    names = employee_df["Employee Name"].to_numpy()
+    loans = np.where(rng.random(len(names)) < 0.15, rng.choice([3000.0, 5000.0, 6000.0, 8000.0], len(names)), 0.0)
+    frames = []
+    for year, month in periods:
+        advances = np.where(rng.random(len(names)) < 0.3, rng.integers(2, 16, len(names)) * 1000.0, 0.0)
+        keep = (advances > 0) | (loans > 0)
+        frames.append(pd.DataFrame({
+            "Employee Name": names[keep],
+            "Year": year,
+            "Month": month,
+            "Monthly Advanced": advances[keep],
+            "Monthly Loan Deduction": loans[keep],
+        }))
+    return pd.concat(frames, ignore_index=True)[DEDUCTION_COLS]
+
+
+def make_attendance(employee_df, periods, holidays_df, rng):
+    dates = pd.DatetimeIndex(np.concatenate([_month_days(year, month).to_numpy() for year, month in periods]))
+    n_employees, n_days = len(employee_df), len(dates)
+    n = n_employees * n_days
+
+    date_col = np.tile(dates.to_numpy(), n_employees)
+    weekday = np.tile(dates.dayofweek.to_numpy(), n_employees)
+    holiday_set = pd.to_datetime(holidays_df["Holiday Date"]).to_numpy()
+    is_holiday = np.isin(date_col, holiday_set)
+
+    absent_chance = np.select(
+        [is_holiday, weekday == 6, weekday == 5], [ABSENT_HOLIDAY, ABSENT_SUNDAY, ABSENT_SATURDAY], ABSENT_WEEKDAY
+    )
+    absent = rng.random(n) < absent_chance
+    present = ~absent
+
+    clock_in = np.clip(np.rint(rng.normal(ON_DUTY, 8, n)), ON_DUTY - 40, ON_DUTY + 60).astype(int)
+    half_day = rng.random(n) < HALF_DAY
+    overtime = np.where(rng.random(n) < OVERTIME, rng.exponential(60, n), rng.normal(0, 5, n))
+    clock_out = np.where(half_day, rng.normal(13 * 60, 20, n), OFF_DUTY + overtime)
+    clock_out = np.clip(np.rint(clock_out), clock_in + 60, 22 * 60).astype(int)
+
+    work = np.minimum(clock_out, OFF_DUTY) - np.maximum(clock_in, ON_DUTY)
+    late = np.maximum(clock_in - ON_DUTY, 0)
+    early = np.maximum(OFF_DUTY - clock_out, 0)
+    ot = np.maximum(clock_out - OFF_DUTY, 0)
+
+    return pd.DataFrame({
+        "AC-No.": np.repeat(np.arange(1, n_employees + 1), n_days),
+        "Name": np.repeat(employee_df["Employee Name"].to_numpy(), n_days),
+        "Date": pd.DatetimeIndex(date_col).strftime(ATTENDANCE_DATE_FORMAT),
+        "On duty": _hhmm(np.full(n, ON_DUTY)),
+        "Off duty": _hhmm(np.full(n, OFF_DUTY)),
+        "Clock In": _blank_unless(present, _hhmm(clock_in)),
+        "Clock Out": _blank_unless(present, _hhmm(clock_out)),
+        "Real time": _blank_unless(present, pd.Series(np.where(work >= FULL_DAY_MINUTES, "1", "0.5"))),
+        "Late": _blank_unless(present & (late > 0), _hhmm(late)),
+        "Early": _blank_unless(present & (early > 0), _hhmm(early)),
+        "Absent": np.where(absent, "True", ""),
+        "OT Time": _blank_unless(present & (ot > 0), _hhmm(ot)),
+        "Work Time": _blank_unless(present, _hhmm(np.maximum(work, 0))),
+        "ATT_Time": _blank_unless(present, _hhmm(clock_out - clock_in)),
+    })[ATTENDANCE_COLS]
+
+
+def generate_dataset(root, employees, months, start_year=2025, start_month=1, seed=0):
+    """Write the four data files under ``root``/data. Returns the periods and row counts."""
+    rng = np.random.default_rng(seed)
+    periods = month_periods(months, start_year, start_month)
+    employee_df = make_employees(employees, rng)
+    holidays_df = make_holidays(periods, rng)
+    deduction_df = make_deductions(employee_df, periods, rng)
+    attendance_df = make_attendance(employee_df, periods, holidays_df, rng)
+
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    for df, path in [(employee_df, EMPLOYEE_FILE), (holidays_df, HOLIDAY_FILE),
+                     (deduction_df, DEDUCTION_FILE), (attendance_df, ATTENDANCE_FILE)]:
+        df.to_csv(os.path.join(root, path), index=False)
+    return {
+        "periods": periods,
+        "employees": employees,
+        "months": months,
+        "attendance_rows": len(attendance_df),
+        "deduction_rows": len(deduction_df),
+        "holidays": len(holidays_df),
+    }
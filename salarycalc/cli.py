@@ -0,0 +1,128 @@
+"""Command-line payroll runner (no Streamlit needed).
+
+    python -m salarycalc run --year 2025 --month June
+
+Loads data/, computes every employee's payroll for the month and writes the
+register to data/payroll_register/{year}/{month}_{year}.csv (or --output).
+``--slips`` also renders the salary slips PDF (needs reportlab).
+
+    python -m salarycalc migrate
+
+copies the CSV files and exported summaries into data/salarycalc.db for the
+``SALARYCALC_STORE=sqlite`` backend.
+
+    python -m salarycalc bench --scales 25x1,100x3,250x6
+
+times ingestion, export, payroll and slip rendering on synthetic data and
+writes a JSON report (see ``salarycalc.bench``).
+"""
+import argparse
+import calendar
+import datetime
+import json
+import os
+import sys
+
+from salarycalc import db
+from salarycalc.data import load_deductions, load_employees, load_holidays, migrate_to_sqlite
+from salarycalc.payroll import compute_payroll, payroll_register
+from salarycalc.store import load_month_summary, migrate_summaries_to_sqlite
+
+REGISTER_ROOT = "data/payroll_register"
+
+
+def register_path(year, month):
+    return os.path.join(REGISTER_ROOT, str(year), f"{month}_{year}.csv")
+
+
+def run(args):
+    if args.root:
+        os.chdir(args.root)
+
+    month_summary = load_month_summary(args.year, args.month)
+    if month_summary.empty:
+        print(f"No monthly summaries for {args.month} {args.year}. Export them from the Attendance Dashboard first.",
+              file=sys.stderr)
+        return 1
+
+    payroll_df = compute_payroll(
+        load_employees(), month_summary, load_deductions(), load_holidays(), args.year, args.month
+    )
+    register = payroll_register(payroll_df)
+
+    output = args.output or register_path(args.year, args.month)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    register.to_csv(output, index=False)
+
+    skipped = int((~payroll_df["Has Summary"]).sum())
+    print(f"Wrote {len(register)} employee(s) to {output}" + (f" ({skipped} without attendance skipped)" if skipped else ""))
+    if args.slips:
+        from salarycalc.slip_pdf import render_slips_pdf
+        slips = payroll_df[payroll_df["Has Summary"]].sort_values("Employee Name")
+        print(f"Wrote salary slips to {render_slips_pdf(slips, args.year, args.month)}")
+    print(f"Gross: {register['Gross Salary'].sum():,.2f}  Net: {register['Net Salary'].sum():,.2f}  "
+          f"EPF 8%: {register['EPF 8%'].sum():,.2f}  EPF 12%: {register['EPF 12%'].sum():,.2f}  "
+          f"ETF 3%: {register['ETF 3%'].sum():,.2f}")
+    return 0
+
+
+def migrate(args):
+    if args.root:
+        os.chdir(args.root)
+    for table, rows in migrate_to_sqlite().items():
+        print(f"{table}: {rows} row(s)")
+    files, rows = migrate_summaries_to_sqlite()
+    print(f"summaries: {rows} row(s) from {files} file(s)")
+    print(f"Migrated to {db.DB_FILE}. Set SALARYCALC_STORE=sqlite to use it.")
+    return 0
+
+
+def bench(args):
+    from salarycalc.bench.suite import parse_scales, run_suite
+
+    output = os.path.abspath(
+        args.output or f"bench_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+
+    def show(result):
+        print(f"{result['employees']} employees x {result['months']} month(s), "
+              f"{result['attendance_rows']:,} attendance rows")
+        for stage, timing in result["stages"].items():
+            print(f"  {stage:<24} {timing['seconds']:>9.3f}s  {timing['rows']:>9,} rows  "
+                  f"{timing['us_per_row'] or 0:>9.1f} us/row")
+
+    report = run_suite(parse_scales(args.scales), repeat=args.repeat, workers=args.workers, seed=args.seed,
+                       on_result=show)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m salarycalc", description="Batch payroll runner")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="compute a month's payroll register")
+    run_parser.add_argument("--year", type=int, required=True)
+    run_parser.add_argument("--month", required=True, choices=list(calendar.month_name)[1:])
+    run_parser.add_argument("--output", help="register CSV path (default: data/payroll_register/...)")
+    run_parser.add_argument("--slips", action="store_true", help="also render the salary slips PDF")
+    run_parser.add_argument("--root", help="app folder containing data/ (default: current directory)")
+    run_parser.set_defaults(func=run)
+
+    migrate_parser = commands.add_parser("migrate", help="copy the CSV data into the SQLite database")
+    migrate_parser.add_argument("--root", help="app folder containing data/ (default: current directory)")
+    migrate_parser.set_defaults(func=migrate)
+
+    bench_parser = commands.add_parser("bench", help="benchmark the pipeline on synthetic data")
+    bench_parser.add_argument("--scales", default="25x1,100x3,250x6",
+                              help="comma-separated EMPLOYEESxMONTHS sizes (default: 25x1,100x3,250x6)")
+    bench_parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the best time is reported")
+    bench_parser.add_argument("--workers", type=int, default=1, help="export worker processes")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--output", help="report path (default: bench_<timestamp>.json)")
+    bench_parser.set_defaults(func=bench)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
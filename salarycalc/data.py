@@ -0,0 +1,305 @@
+"""Cached loaders for the CSV files under data/.
+
+Parsed frames are cached per process, keyed on the file's path, size and
+modification time. A rerun that changes nothing re-uses the parsed frame,
+and any write to the file invalidates it. Callers always get their own copy,
+so editing a loaded frame never changes what the next caller sees.
+
+Edits to the employee, deduction and holiday files go to an append-only
+journal next to the file (see ``salarycalc.journal``). ``load_data``
+applies it on read, and it is compacted into the base file once it holds
+``JOURNAL_COMPACT_AT`` records.
+
+With ``SALARYCALC_STORE=sqlite`` the same loaders and writers use the
+tables in ``salarycalc.db`` instead; ``migrate_to_sqlite`` copies the CSV
+files (journals applied) across once. The processed attendance stays a CSV
+file under every backend.
+"""
+import os
+import threading
+
+import pandas as pd
+
+from salarycalc import db
+from salarycalc.attendance import (
+    ATTENDANCE_COLUMNS, attendance_text, compact_attendance, slice_offsets, sort_slices,
+)
+from salarycalc.journal import (
+    append_changes, apply_changes, diff_changes, journal_path, journal_row, read_changes, row_key, write_atomic,
+)
+
+EMPLOYEE_FILE = "data/employee_data.csv"
+DEDUCTION_FILE = "data/monthly_deductions.csv"
+HOLIDAY_FILE = "data/holidays.csv"
+ATTENDANCE_FILE = "data/attendance_processed.csv"
+
+EMPLOYEE_COLS = [
+    "Employee Name", "Employee Type", "EPF No", "Basic Salary",
+    "BRA", "Salary for EPF", "Normal Pay Rate", "Normal Pay Hourly Rate",
+    "Overtime Pay Hourly Rate", "Sunday Pay Rate", "Attendance Bonus",
+    "Other Allowances", "Meal Allowance", "EPF 8%", "EPF 12%", "ETF 3%"
+]
+DEDUCTION_COLS = ["Employee Name", "Year", "Month", "Monthly Advanced", "Monthly Loan Deduction"]
+HOLIDAY_COLS = ["Holiday Date", "Holiday Name", "Year", "Month"]
+
+ATTENDANCE_DATE_FORMAT = "%d/%m/%Y"
+ATTENDANCE_DERIVED_COLS = ["Day", "Year", "Month"]
+# Read as text and typed by ``compact_attendance``; Name goes straight to a categorical
+ATTENDANCE_READ_DTYPES = {"AC-No.": str, "Name": "category", "Date": str, "Clock In": str, "Clock Out": str,
+                          "Absent": str, "Work Time": str}
+
+JOURNAL_KEYS = {
+    EMPLOYEE_FILE: ["Employee Name"],
+    DEDUCTION_FILE: ["Employee Name", "Year", "Month"],
+    HOLIDAY_FILE: ["Holiday Date"],
+}
+JOURNAL_COMPACT_AT = 200
+
+# SQLite table, columns and extra indexes per master file (keys are JOURNAL_KEYS)
+SQL_TABLES = {
+    EMPLOYEE_FILE: ("employees", EMPLOYEE_COLS, []),
+    DEDUCTION_FILE: ("deductions", DEDUCTION_COLS, [["Year", "Month"]]),
+    HOLIDAY_FILE: ("holidays", HOLIDAY_COLS, [["Year", "Month"]]),
+}
+SQL_REAL_COLS = [
+    "Basic Salary", "BRA", "Salary for EPF", "Normal Pay Rate", "Sunday Pay Rate", "Attendance Bonus",
+    "Other Allowances", "Meal Allowance", "EPF 8%", "EPF 12%", "ETF 3%",
+    "Monthly Advanced", "Monthly Loan Deduction",
+]
+
+_cache = {}
+_lock = threading.Lock()
+_journal_lock = threading.Lock()
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def cached_read(path, parse):
+    """Return ``parse(path)``, re-using the last result while the file is unchanged."""
+    signature = _signature(path)
+    with _lock:
+        hit = _cache.get((path, parse))
+    if hit is not None and hit[0] == signature:
+        return hit[1].copy()
+
+    df = parse(path)
+    with _lock:
+        _cache[(path, parse)] = (signature, df)
+    return df.copy()
+
+
+def invalidate(path=None):
+    """Drop the cached frame for ``path`` (or every cached frame)."""
+    with _lock:
+        for key in list(_cache):
+            if path is None or key[0] == path:
+                del _cache[key]
+
+
+def save_csv(df, path, **to_csv_kwargs):
+    """Write ``df`` to ``path`` and drop its cache entry (and any journal it supersedes)."""
+    with _journal_lock:
+        write_atomic(df, path, **to_csv_kwargs)
+        if os.path.exists(journal_path(path)):
+            os.remove(journal_path(path))
+    invalidate(path)
+    invalidate(journal_path(path))
+
+
+def _ensure_sql_table(conn, path):
+    table, columns, indexes = SQL_TABLES[path]
+    db.ensure_table(conn, table, columns, JOURNAL_KEYS[path], indexes, real_cols=SQL_REAL_COLS)
+
+
+def load_data(path, empty_cols, parse=pd.read_csv):
+    """Cached read of ``path``; an empty frame with ``empty_cols`` if it is missing or empty."""
+    if path in SQL_TABLES and db.enabled():
+        table, columns, _ = SQL_TABLES[path]
+        return db.read_table(table, columns)
+    return _load_csv(path, empty_cols, parse)
+
+
+def _load_csv(path, empty_cols, parse):
+    # The journal is read before the base file: if a compaction lands in
+    # between, the base already holds these changes and re-applying them is
+    # harmless, whereas the other order could miss them
+    changes = cached_read(journal_path(path), read_changes) if path in JOURNAL_KEYS else []
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        df = cached_read(path, parse)
+    else:
+        df = pd.DataFrame(columns=empty_cols)
+    return apply_changes(df, changes, JOURNAL_KEYS[path]) if changes else df
+
+
+def record_changes(path, changes):
+    """Append change records to the journal of ``path``; compacts in the background past the threshold."""
+    if not changes:
+        return
+    if path in SQL_TABLES and db.enabled():
+        _apply_sql_changes(path, changes)
+        return
+    with _journal_lock:
+        append_changes(path, changes)
+    invalidate(journal_path(path))
+    if len(cached_read(journal_path(path), read_changes)) >= JOURNAL_COMPACT_AT:
+        threading.Thread(target=compact_journal, args=(path,), daemon=True).start()
+
+
+def _apply_sql_changes(path, changes):
+    """Apply change records to the SQLite table of ``path`` in one transaction."""
+    table, columns, _ = SQL_TABLES[path]
+    key = JOURNAL_KEYS[path]
+    with db.transaction() as conn:
+        _ensure_sql_table(conn, path)
+        for change in changes:
+            if change["op"] == "upsert":
+                db.upsert(conn, table, columns, key, db.rows_of(pd.DataFrame([change["row"]]), columns))
+            else:
+                db.delete(conn, table, key, [tuple(change["key"])])
+
+
+def journal_upsert(path, rows):
+    """Journal ``rows`` (dicts) as the new values for their keys."""
+    record_changes(path, [
+        {"op": "upsert", "key": list(row_key(row, JOURNAL_KEYS[path])), "row": journal_row(row)} for row in rows
+    ])
+
+
+def journal_delete(path, rows):
+    """Journal the deletion of the keys of ``rows`` (dicts or Series)."""
+    record_changes(path, [{"op": "delete", "key": list(row_key(row, JOURNAL_KEYS[path]))} for row in rows])
+
+
+def journal_sync(path, current_df, new_df):
+    """Journal only the differences that turn ``current_df`` into ``new_df``."""
+    record_changes(path, diff_changes(current_df, new_df, JOURNAL_KEYS[path]))
+
+
+def compact_journal(path):
+    """Fold the journal of ``path`` into the base file (atomic rewrite) and remove it."""
+    empty_cols, parse = _JOURNALED_TABLES[path]
+    with _journal_lock:
+        if not os.path.exists(journal_path(path)):
+            return
+        write_atomic(_load_csv(path, empty_cols, parse), path)
+        os.remove(journal_path(path))
+    invalidate(path)
+    invalidate(journal_path(path))
+
+
+def _read_holidays(path):
+    holidays_df = pd.read_csv(path)
+    holidays_df['Holiday Date'] = pd.to_datetime(holidays_df['Holiday Date'], format='mixed', errors='coerce')
+    return holidays_df
+
+
+def _read_attendance(path):
+    df = pd.read_csv(path, usecols=lambda col: col in ATTENDANCE_COLUMNS, dtype=ATTENDANCE_READ_DTYPES)
+    df['Date'] = pd.to_datetime(df['Date'], format=ATTENDANCE_DATE_FORMAT)
+    return sort_slices(compact_attendance(df))
+
+
+def _read_attendance_slices(path):
+    return slice_offsets(cached_read(path, _read_attendance))
+
+
+def _read_attendance_names(path):
+    return pd.read_csv(path, usecols=['Name'], dtype={'Name': 'category'})
+
+
+_JOURNALED_TABLES = {
+    EMPLOYEE_FILE: (EMPLOYEE_COLS, pd.read_csv),
+    DEDUCTION_FILE: (DEDUCTION_COLS, pd.read_csv),
+    HOLIDAY_FILE: (HOLIDAY_COLS, _read_holidays),
+}
+
+
+def load_employees():
+    return load_data(EMPLOYEE_FILE, EMPLOYEE_COLS)
+
+
+def load_deductions():
+    return load_data(DEDUCTION_FILE, DEDUCTION_COLS)
+
+
+def load_holidays():
+    holidays_df = load_data(HOLIDAY_FILE, HOLIDAY_COLS, parse=_read_holidays)
+    if not pd.api.types.is_datetime64_any_dtype(holidays_df['Holiday Date']):
+        # Only SQLite rows and a missing file arrive untyped; the cached CSV parse already typed the dates
+        holidays_df['Holiday Date'] = pd.to_datetime(holidays_df['Holiday Date'], format='mixed', errors='coerce')
+    return holidays_df
+
+
+def save_attendance(df):
+    """Write the processed attendance file (DD/MM/YYYY dates).
+
+    Every column of ``df`` is written, device columns the app does not read
+    included; only the Day/Year/Month columns derived on load are left out.
+    """
+    text_df = attendance_text(df.drop(columns=ATTENDANCE_DERIVED_COLS, errors='ignore'))
+    save_csv(text_df, ATTENDANCE_FILE, date_format=ATTENDANCE_DATE_FORMAT)
+
+
+def migrate_to_sqlite():
+    """Copy the master CSVs (journals applied) into SQLite in one transaction.
+
+    Returns the number of rows copied per table.
+    """
+    copied = {}
+    with db.transaction() as conn:
+        for path, (table, columns, _) in SQL_TABLES.items():
+            empty_cols, parse = _JOURNALED_TABLES[path]
+            df = _load_csv(path, empty_cols, parse).drop_duplicates(JOURNAL_KEYS[path])
+            _ensure_sql_table(conn, path)
+            db.clear_table(conn, table)
+            db.insert(conn, table, columns, db.rows_of(df, columns))
+            copied[table] = len(df)
+    return copied
+
+
+def load_attendance():
+    """Processed attendance in the typed schema of ``compact_attendance``, or None if not uploaded.
+
+    Rows are sorted by (Name, Year, Month); see ``load_attendance_slices``.
+    Raises ValueError when the dates are not DD/MM/YYYY.
+    """
+    if not os.path.exists(ATTENDANCE_FILE):
+        return None
+    return cached_read(ATTENDANCE_FILE, _read_attendance)
+
+
+def master_token():
+    """Changes whenever employee, deduction or holiday data is saved (the signatures ``cached_read`` keys on)."""
+    if db.enabled():
+        return _signature(db.DB_FILE), _signature(db.DB_FILE + "-wal")
+    return tuple(_signature(file) for path in SQL_TABLES for file in (path, journal_path(path)))
+
+
+def attendance_signature():
+    """Size and modification time of the processed attendance file (None if not uploaded)."""
+    return _signature(ATTENDANCE_FILE)
+
+
+def load_attendance_slices():
+    """``{(name, year, month): (start, stop)}`` row positions into ``load_attendance()`` (empty if none).
+
+    Computed once per version of the file, so selecting an employee-month is
+    a positional slice rather than a scan of the whole frame.
+    """
+    if not os.path.exists(ATTENDANCE_FILE):
+        return {}
+    return cached_read(ATTENDANCE_FILE, _read_attendance_slices)
+
+
+def load_attendance_names():
+    """Sorted employee names from the processed attendance (empty if none was uploaded)."""
+    if not os.path.exists(ATTENDANCE_FILE):
+        return []
+    names = cached_read(ATTENDANCE_FILE, _read_attendance_names)
+    return sorted(names['Name'].dropna().unique())
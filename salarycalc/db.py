@@ -0,0 +1,129 @@
+"""SQLite storage backend.
+
+Selected with ``SALARYCALC_STORE=sqlite``. The master tables and the monthly
+summaries then live in one local database, data/salarycalc.db, with indexes
+on employee and period. Every
+multi-row write is one transaction. WAL mode lets readers continue while
+another session writes.
+
+Columns keep the CSV names and use NUMERIC affinity, so values round-trip
+the way ``pd.read_csv`` would type them; amount columns are REAL so they
+stay floats, and opaque tokens are TEXT.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+DB_FILE = os.environ.get("SALARYCALC_DB", "data/salarycalc.db")
+
+
+def configured_store():
+    """The ``SALARYCALC_STORE`` setting, read on every call so the whole app follows one value."""
+    return os.environ.get("SALARYCALC_STORE", "csv").lower()
+
+
+def enabled():
+    return configured_store() == "sqlite"
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect():
+    os.makedirs(os.path.dirname(DB_FILE) or ".", exist_ok=True)
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+@contextmanager
+def transaction():
+    """A connection whose statements commit together (or roll back on error)."""
+    conn = connect()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _affinity(col, real_cols, text_cols):
+    if col in real_cols:
+        return "REAL"
+    return "TEXT" if col in text_cols else "NUMERIC"
+
+
+def ensure_table(conn, table, columns, key=(), indexes=(), real_cols=(), text_cols=()):
+    cols = ", ".join(f"{_q(col)} {_affinity(col, real_cols, text_cols)}" for col in columns)
+    if key:
+        cols += f", PRIMARY KEY ({', '.join(_q(col) for col in key)})"
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_q(table)} ({cols})")
+    for index_cols in indexes:
+        name = f"ix_{table}_" + "_".join("".join(ch for ch in col if ch.isalnum()) for col in index_cols)
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {_q(name)} ON {_q(table)} ({', '.join(_q(col) for col in index_cols)})"
+        )
+
+
+def _sql_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def rows_of(df, columns):
+    return [tuple(_sql_value(v) for v in row) for row in df.reindex(columns=columns).itertuples(index=False, name=None)]
+
+
+def insert(conn, table, columns, rows):
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(
+        f"INSERT INTO {_q(table)} ({', '.join(_q(col) for col in columns)}) VALUES ({placeholders})", rows
+    )
+
+
+def upsert(conn, table, columns, key, rows):
+    """Insert ``rows`` (tuples in ``columns`` order), updating rows whose ``key`` already exists."""
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{_q(col)} = excluded.{_q(col)}" for col in columns if col not in key)
+    conn.executemany(
+        f"INSERT INTO {_q(table)} ({', '.join(_q(col) for col in columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({', '.join(_q(col) for col in key)}) DO UPDATE SET {updates}",
+        rows,
+    )
+
+
+def delete(conn, table, key, keys):
+    """Delete the rows matching each tuple of ``key`` values in ``keys``."""
+    where = " AND ".join(f"{_q(col)} = ?" for col in key)
+    conn.executemany(f"DELETE FROM {_q(table)} WHERE {where}", keys)
+
+
+def clear_table(conn, table):
+    if table_exists(conn, table):
+        conn.execute(f"DELETE FROM {_q(table)}")
+
+
+def table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def read_table(table, columns, where="", params=()):
+    """``SELECT columns FROM table [where]`` as a frame (empty with ``columns`` if the table is missing)."""
+    conn = connect()
+    try:
+        if not table_exists(conn, table):
+            return pd.DataFrame(columns=columns)
+        return pd.read_sql_query(
+            f"SELECT {', '.join(_q(col) for col in columns)} FROM {_q(table)} {where}", conn, params=params
+        )
+    finally:
+        conn.close()
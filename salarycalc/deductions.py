@@ -0,0 +1,72 @@
+"""Keyed monthly deductions store.
+
+Rows of monthly_deductions.csv are held in a dict keyed by
+(employee, year, month), so lookups and upserts are O(1) however long the
+loan schedules get. Edits are batched in memory and written with one
+``flush``.
+"""
+import pandas as pd
+
+from salarycalc.data import DEDUCTION_COLS, DEDUCTION_FILE, journal_upsert, load_deductions
+
+
+def _key(name, year, month):
+    return str(name), int(year), str(month)
+
+
+def _amount(value):
+    return 0.0 if pd.isna(value) else float(value)
+
+
+class DeductionStore:
+    def __init__(self, deductions_df):
+        self._rows = {}
+        for name, year, month, advance, loan in deductions_df[DEDUCTION_COLS].itertuples(index=False):
+            if pd.isna(name) or pd.isna(year):
+                continue
+            # First row wins, as in compute_payroll
+            self._rows.setdefault(_key(name, year, month), [_amount(advance), _amount(loan)])
+        self._dirty = set()
+
+    @classmethod
+    def load(cls):
+        return cls(load_deductions())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return _key(*key) in self._rows
+
+    def get(self, name, year, month):
+        """``(advance, loan)`` for the employee-month, or ``(0.0, 0.0)`` if there is no row."""
+        advance, loan = self._rows.get(_key(name, year, month), (0.0, 0.0))
+        return advance, loan
+
+    def upsert(self, name, year, month, advance=None, loan=None):
+        """Set the advance and/or loan for one employee-month. ``None`` keeps the current value."""
+        key = _key(name, year, month)
+        row = self._rows.setdefault(key, [0.0, 0.0])
+        if advance is not None:
+            row[0] = float(advance)
+        if loan is not None:
+            row[1] = float(loan)
+        self._dirty.add(key)
+
+    def upsert_many(self, entries):
+        """Upsert ``(name, year, month, advance, loan)`` tuples in one pass."""
+        for name, year, month, advance, loan in entries:
+            self.upsert(name, year, month, advance, loan)
+
+    def to_frame(self):
+        return pd.DataFrame(
+            [(*key, advance, loan) for key, (advance, loan) in self._rows.items()],
+            columns=DEDUCTION_COLS,
+        )
+
+    def flush(self):
+        """Journal the rows changed since the last flush in one append."""
+        journal_upsert(DEDUCTION_FILE, [
+            dict(zip(DEDUCTION_COLS, (*key, *self._rows[key]))) for key in self._rows if key in self._dirty
+        ])
+        self._dirty.clear()
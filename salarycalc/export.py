@@ -0,0 +1,34 @@
+"""Export of per-employee monthly summary files."""
+import os
+
+from salarycalc.attendance import SUMMARY_COLS
+
+SUMMARY_ROOT = "data/monthly_summary"
+
+
+def summary_path(emp, year, month, root=SUMMARY_ROOT):
+    """Path of one employee's summary file, e.g. data/monthly_summary/2025/June/Adin_June_2025.csv."""
+    emp_filename = f"{emp}_{month}_{year}.csv".replace(" ", "_")
+    return os.path.join(root, str(year), month, emp_filename)
+
+
+def export_monthly_summaries(normalized_df, root=SUMMARY_ROOT):
+    """Write every (Name, Year, Month) group of a normalized frame to its summary CSV.
+
+    Groups the frame once instead of filtering it per employee.
+    Returns ``(files_written, rows_written)``.
+    """
+    export_df = normalized_df.copy()
+    for col in SUMMARY_COLS:
+        if col not in export_df.columns:
+            export_df[col] = ''
+
+    files_written = 0
+    rows_written = 0
+    for (emp, year, month), group in export_df.groupby(['Name', 'Year', 'Month'], sort=False, observed=True):
+        path = summary_path(emp, year, month, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        group[SUMMARY_COLS].to_csv(path, index=False)
+        files_written += 1
+        rows_written += len(group)
+    return files_written, rows_written
@@ -0,0 +1,122 @@
+"""Incremental summary export.
+
+Each (AC-No., Year, Month) slice of the attendance is fingerprinted with a
+content hash and compared against the manifest from the previous export.
+Only summaries fed by a changed slice (or whose file has gone missing) are
+recomputed and rewritten.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from salarycalc.export import summary_path
+from salarycalc.parallel import export_parallel
+from salarycalc.store import active_backend, month_path, sql_summary_keys
+
+MANIFEST_FILE = "data/summary_manifest.json"
+FINGERPRINT_COLS = ['Name', 'Date', 'Clock In', 'Clock Out', 'Absent', 'Work Time']
+
+
+def _slice_keys(df):
+    return ['AC-No.' if 'AC-No.' in df.columns else 'Name', 'Year', 'Month']
+
+
+def _ids(df, cols):
+    """Vectorized "a|b|c" id per row from the given columns."""
+    parts = [df[col].astype(str).fillna("nan") for col in cols]
+    ids = parts[0]
+    for part in parts[1:]:
+        ids = ids + "|" + part
+    return ids
+
+
+def update_fingerprints(hashers, df):
+    """Feed the rows of ``df`` into one running SHA-1 per slice (``hashers`` maps slice id to hash).
+
+    Feeding a frame in consecutive chunks gives the same digests as feeding it whole.
+    """
+    cols = [col for col in FINGERPRINT_COLS if col in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[cols].astype(str), index=False)
+    for key, hashes in row_hashes.groupby(_ids(df, _slice_keys(df)).to_numpy(), sort=False):
+        hashers.setdefault(key, hashlib.sha1()).update(hashes.to_numpy().tobytes())
+    return hashers
+
+
+def slice_fingerprints(df):
+    """SHA-1 of every (AC-No., Year, Month) slice, keyed by "ac|year|month"."""
+    return {key: hasher.hexdigest() for key, hasher in update_fingerprints({}, df).items()}
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {"backend": None, "slices": {}}
+    with open(MANIFEST_FILE) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def clear_manifest():
+    if os.path.exists(MANIFEST_FILE):
+        os.remove(MANIFEST_FILE)
+
+
+def record_fingerprints(fingerprints):
+    """Mark the given slices as exported, for summaries written outside ``save_changed_summaries``."""
+    backend = active_backend()
+    manifest = load_manifest()
+    previous = manifest["slices"] if manifest.get("backend") == backend else {}
+    save_manifest({"backend": backend, "slices": {**previous, **fingerprints}})
+
+
+def save_changed_summaries(df, force=False, workers=1, on_progress=None):
+    """Rewrite only the monthly summaries whose input slices changed since the last export.
+
+    ``df`` is the processed attendance with Day/Year/Month derived. The changed
+    months are exported by ``workers`` processes (see ``export_parallel``).
+    Returns a dict with ``files``/``rows`` written and ``changed``/``skipped``
+    slice counts.
+    """
+    backend = active_backend()
+    manifest = load_manifest()
+    previous = manifest["slices"] if manifest.get("backend") == backend and not force else {}
+    fingerprints = slice_fingerprints(df)
+
+    slice_id = _ids(df, _slice_keys(df))
+    changed_ids = {key for key, digest in fingerprints.items() if previous.get(key) != digest}
+
+    # One output per month (parquet) or per employee-month (csv, sqlite); a deleted
+    # output must be rewritten even if its inputs are unchanged
+    output_cols = ['Year', 'Month'] if backend == "parquet" else ['Name', 'Year', 'Month']
+    output_id = _ids(df, output_cols)
+    if backend == "sqlite":
+        missing = set(output_id) - sql_summary_keys()
+    else:
+        missing = set()
+        for row in df[output_cols].drop_duplicates().itertuples(index=False):
+            path = month_path(*row) if backend == "parquet" else summary_path(*row)
+            if not os.path.exists(path):
+                missing.add("|".join(str(part) for part in row))
+
+    affected = set(output_id[slice_id.isin(changed_ids)]) | missing
+    changed_rows = df[output_id.isin(affected)]
+
+    files_written, rows_written = 0, 0
+    if not changed_rows.empty:
+        files_written, rows_written = export_parallel(changed_rows, workers=workers, on_progress=on_progress)
+
+    manifest = {"backend": backend, "slices": {**previous, **fingerprints}}
+    save_manifest(manifest)
+    return {
+        "files": files_written,
+        "rows": rows_written,
+        "changed": len(changed_ids),
+        "skipped": len(fingerprints) - len(changed_ids),
+    }
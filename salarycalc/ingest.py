@@ -0,0 +1,106 @@
+"""Chunked ingestion of large attendance exports.
+
+Reads the upload a chunk at a time with explicit dtypes and only the columns
+the app uses, validates and normalizes each chunk, and appends it to the
+processed attendance file and the monthly summaries. Memory stays bounded by
+the chunk size rather than the size of the export.
+
+Both outputs are staged and only published once the last chunk has been
+written, so an upload that fails partway leaves the previous attendance
+and summaries as they were. The slices it exports are fingerprinted as they
+stream past and recorded in the summary manifest, so a later Save All sees
+the same state as after a regular export.
+"""
+import os
+
+import pandas as pd
+
+from salarycalc.attendance import compact_attendance, normalize_attendance
+from salarycalc.data import ATTENDANCE_DATE_FORMAT, ATTENDANCE_FILE, invalidate
+from salarycalc.incremental import record_fingerprints, update_fingerprints
+from salarycalc.store import SummaryAppender
+
+INGEST_DTYPES = {
+    "AC-No.": "Int64",
+    "Name": str,
+    "Date": str,
+    "Clock In": str,
+    "Clock Out": str,
+    "Absent": str,
+    "Work Time": str,
+}
+REQUIRED_COLS = ["Name", "Date"]
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def validate_chunk(chunk):
+    """Parse dates and drop rows without a name or a DD/MM/YYYY date.
+
+    Returns ``(valid_rows, rejected_count)``; raises ValueError if a required
+    column is missing.
+    """
+    missing = [col for col in REQUIRED_COLS if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Attendance file is missing column(s): {', '.join(missing)}")
+
+    chunk = chunk.copy()
+    chunk['Date'] = pd.to_datetime(chunk['Date'], format=ATTENDANCE_DATE_FORMAT, errors='coerce')
+    valid = chunk['Date'].notna() & chunk['Name'].notna()
+    chunk = chunk[valid]
+    chunk['Day'] = chunk['Date'].dt.day_name()
+    chunk['Year'] = chunk['Date'].dt.year
+    chunk['Month'] = chunk['Date'].dt.month_name()
+    return chunk, int((~valid).sum())
+
+
+def ingest_attendance_stream(source, attendance_path=ATTENDANCE_FILE, chunksize=DEFAULT_CHUNKSIZE,
+                             on_chunk=None):
+    """Stream ``source`` (a path or file object) into the attendance file and monthly summaries.
+
+    ``on_chunk(rows_so_far)`` is called after each chunk. Returns a dict with
+    the chunk, row, rejected-row and summary-file counts. On an error (for
+    example ValueError for a non-numeric AC-No.) nothing is published.
+    """
+    reader = pd.read_csv(
+        source,
+        usecols=lambda col: col in INGEST_DTYPES,
+        dtype=INGEST_DTYPES,
+        chunksize=chunksize,
+    )
+    os.makedirs(os.path.dirname(attendance_path) or ".", exist_ok=True)
+
+    staged_path = attendance_path + ".tmp"
+
+    stats = {"chunks": 0, "rows": 0, "rejected": 0, "summary_files": 0}
+    hashers = {}
+    try:
+        with SummaryAppender() as summaries:
+            for chunk in reader:
+                chunk, rejected = validate_chunk(chunk)
+                chunk.drop(columns=['Day', 'Year', 'Month']).to_csv(
+                    staged_path,
+                    mode='w' if stats["chunks"] == 0 else 'a',
+                    header=stats["chunks"] == 0,
+                    index=False,
+                    date_format=ATTENDANCE_DATE_FORMAT,
+                )
+                summaries.write(normalize_attendance(chunk))
+                update_fingerprints(hashers, compact_attendance(chunk))
+
+                stats["chunks"] += 1
+                stats["rows"] += len(chunk)
+                stats["rejected"] += rejected
+                if on_chunk is not None:
+                    on_chunk(stats["rows"])
+            summaries.commit()
+            stats["summary_files"] = summaries.files_written
+        if stats["chunks"]:
+            os.replace(staged_path, attendance_path)
+    finally:
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+
+    invalidate(attendance_path)
+    # Later incremental exports must see the streamed employee-months as up to date
+    record_fingerprints({key: hasher.hexdigest() for key, hasher in hashers.items()})
+    return stats
@@ -0,0 +1,170 @@
+"""Append-only change journals for the master CSV files.
+
+Every edit is appended to ``<file>.journal`` as one JSON line:
+``{"op": "upsert", "key": [...], "row": {...}}`` or
+``{"op": "delete", "key": [...]}``. Readers apply the journal on top of the
+base file, so a save costs one small append and the base file is only
+rewritten (atomically) when the journal is compacted into it.
+"""
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def journal_path(base_path):
+    return base_path + ".journal"
+
+
+def key_part(value):
+    """Normalize one key value so CSV-parsed and journaled keys compare equal."""
+    if pd.isna(value):
+        return ""
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def row_key(row, key_cols):
+    return tuple(key_part(row[col]) for col in key_cols)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.strftime("%Y-%m-%d")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _trim_torn_tail(path):
+    """Cut a torn last record (a crash mid-append leaves it without its newline) off ``path``."""
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position += newline + 1
+                break
+        if position < end:
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def append_changes(base_path, changes):
+    """Append change records and fsync, so a saved edit survives a crash.
+
+    A torn record left by an earlier crash is cut off first, so the new
+    records start on a line of their own.
+    """
+    _trim_torn_tail(journal_path(base_path))
+    with open(journal_path(base_path), "a", encoding="utf-8") as f:
+        for change in changes:
+            f.write(json.dumps(change, default=_json_default) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_changes(path):
+    """The change records of a journal file.
+
+    A line that does not parse (a torn last record, from a crash mid-append)
+    is skipped; the records after it are still read. A missing journal (none
+    written yet, or just compacted away) has no records.
+    """
+    changes = []
+    try:
+        f = open(path, encoding="utf-8", errors="replace")
+    except FileNotFoundError:
+        return changes
+    with f:
+        for line in f:
+            try:
+                changes.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return changes
+
+
+def journal_row(row):
+    """``row`` as a journal record: dates become "YYYY-MM-DD" strings, like the CSV files hold them."""
+    return {col: _json_default(value) if isinstance(value, (pd.Timestamp, datetime.date)) or value is pd.NaT
+            else value for col, value in row.items()}
+
+
+def _typed_like(new_rows, base_df):
+    """Give journaled columns the dtype of the parsed base (dates are strings in the journal)."""
+    for col in new_rows.columns.intersection(base_df.columns):
+        if pd.api.types.is_datetime64_any_dtype(base_df[col]):
+            new_rows[col] = pd.to_datetime(new_rows[col], format="ISO8601", errors="coerce")
+    return new_rows
+
+
+def apply_changes(base_df, changes, key_cols):
+    """``base_df`` with the journal applied.
+
+    An upserted row replaces its key's row where it stands in the base file;
+    rows for new keys go last, in journal order.
+    """
+    final = {}
+    for change in changes:
+        final[tuple(change["key"])] = change.get("row") if change["op"] == "upsert" else None
+    if not final:
+        return base_df
+
+    base_keys = [tuple(key_part(v) for v in values) for values in zip(*(base_df[col] for col in key_cols))]
+    first_position = {}
+    for position, key in enumerate(base_keys):
+        first_position.setdefault(key, position)
+    kept_mask = np.array([key not in final for key in base_keys], dtype=bool)
+    kept = base_df[kept_mask]
+
+    upserts = [(key, row) for key, row in final.items() if row is not None]
+    new_rows = _typed_like(pd.DataFrame([row for _, row in upserts]), base_df)
+    columns = list(base_df.columns) + [col for col in new_rows.columns if col not in base_df.columns]
+    if kept.empty:
+        return new_rows.reindex(columns=columns)
+    if new_rows.empty:
+        return kept.reset_index(drop=True)
+
+    new_positions = [first_position.get(key, len(base_df) + i) for i, (key, _) in enumerate(upserts)]
+    order = np.argsort(np.concatenate([np.flatnonzero(kept_mask), new_positions]), kind="stable")
+    return pd.concat([kept, new_rows], ignore_index=True)[columns].iloc[order].reset_index(drop=True)
+
+
+def diff_changes(current_df, new_df, key_cols):
+    """Upserts for new or changed rows of ``new_df`` and deletes for keys it no longer has."""
+    current = {row_key(row, key_cols): row for row in current_df.to_dict("records")}
+    changes = []
+    seen = set()
+    for row in new_df.to_dict("records"):
+        key = row_key(row, key_cols)
+        seen.add(key)
+        old = current.get(key)
+        if old is None or any(key_part(old.get(col)) != key_part(value) for col, value in row.items()):
+            changes.append({"op": "upsert", "key": list(key), "row": journal_row(row)})
+    changes.extend({"op": "delete", "key": list(key)} for key in current if key not in seen)
+    return changes
+
+
+def write_atomic(df, path, **to_csv_kwargs):
+    """Write ``df`` to a temp file and swap it in, so ``path`` is never left half-written."""
+    tmp_path = path + ".tmp"
+    df.to_csv(tmp_path, index=False, **to_csv_kwargs)
+    os.replace(tmp_path, path)
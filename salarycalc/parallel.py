@@ -0,0 +1,53 @@
+"""Process-pool export of monthly summaries.
+
+The attendance is split into (Year, Month) partitions; each worker process
+normalizes its partition and writes that month's summaries, so a multi-month
+backfill uses every core instead of one.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from salarycalc.attendance import normalize_attendance
+from salarycalc.store import active_backend, save_monthly_summaries
+
+
+def default_workers():
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def export_partition(partition, backend):
+    """Normalize one (Year, Month) partition and write it. Returns ``(files_written, rows_written)``."""
+    return save_monthly_summaries(normalize_attendance(partition), backend)
+
+
+def export_parallel(df, workers=None, on_progress=None):
+    """Export every (Year, Month) partition of ``df`` across ``workers`` processes.
+
+    ``on_progress(done, total)`` is called as partitions finish. Falls back to
+    the current process for a single partition or a single worker.
+    Returns ``(files_written, rows_written)``.
+    """
+    backend = active_backend()
+    workers = workers or default_workers()
+    partitions = [group for _, group in df.groupby(['Year', 'Month'], sort=False, observed=True)]
+    total = len(partitions)
+
+    files_written, rows_written = 0, 0
+    if workers == 1 or total <= 1:
+        for done, partition in enumerate(partitions, 1):
+            files, rows = export_partition(partition, backend)
+            files_written += files
+            rows_written += rows
+            if on_progress is not None:
+                on_progress(done, total)
+        return files_written, rows_written
+
+    with ProcessPoolExecutor(max_workers=min(workers, total)) as pool:
+        futures = [pool.submit(export_partition, partition, backend) for partition in partitions]
+        for done, future in enumerate(as_completed(futures), 1):
+            files, rows = future.result()
+            files_written += files
+            rows_written += rows
+            if on_progress is not None:
+                on_progress(done, total)
+    return files_written, rows_written
@@ -0,0 +1,137 @@
+"""Headless payroll computation.
+
+``compute_payroll`` turns the employee master, one month's attendance
+summaries, the deductions and the holidays into one payroll row per employee
+with a single groupby, so every salary page (and anything without Streamlit)
+shares the same rules.
+"""
+import numpy as np
+import pandas as pd
+
+from salarycalc.attendance import classify_real_day
+from salarycalc.workcalendar import month_calendar
+
+# Types paid from the master record only (no attendance, OT or Sunday pay)
+FIXED_SALARY_TYPES = ["Employee (ORIN)", "Employee (Nescafe)", "Employee (Siyallanka)"]
+
+EPF_EMPLOYEE_RATE = 0.08
+EPF_EMPLOYER_RATE = 0.12
+ETF_RATE = 0.03
+
+RATE_COLS = ["Basic Salary", "BRA", "Salary for EPF", "Normal Pay Rate", "Overtime Pay Hourly Rate",
+             "Sunday Pay Rate", "Attendance Bonus", "Other Allowances", "Meal Allowance"]
+COUNT_COLS = ["Full Days", "Half Days", "Sunday Full", "Sunday Half", "Worked Days", "Absent Days",
+              "Total ATT_Time", "Weekday OT Hours"]
+
+
+def attendance_counts(month_summary, holiday_dates):
+    """Per-employee day and hour counts from a month's summary rows, indexed by Name."""
+    if month_summary.empty:
+        return pd.DataFrame(columns=COUNT_COLS, index=pd.Index([], name="Name"), dtype=float)
+
+    is_sunday = month_summary['Day'].astype(str).str.lower() == 'sunday'
+    att_rounded = pd.to_numeric(month_summary['RND(ATT_Time)'], errors='coerce').fillna(0)
+    real_day = classify_real_day(att_rounded)
+    ot_time = pd.to_numeric(month_summary['OT Time'], errors='coerce').fillna(0)
+    dates = pd.to_datetime(month_summary['Date'], errors='coerce').dt.date
+    absent = month_summary['Absent'].astype(str).str.lower() == 'true'
+
+    flags = pd.DataFrame({
+        "Name": month_summary['Name'].astype(str),
+        "Full Days": ~is_sunday & (real_day == 1.0),
+        "Half Days": ~is_sunday & (real_day == 0.5),
+        "Sunday Full": is_sunday & (real_day == 1.0),
+        "Sunday Half": is_sunday & (real_day == 0.5),
+        "Worked Days": real_day > 0,
+        "Absent Days": absent & ~dates.isin(holiday_dates),
+        "Total ATT_Time": att_rounded,
+        "Weekday OT Hours": ot_time.where(~is_sunday, 0),
+    })
+    return flags.groupby("Name", sort=False)[COUNT_COLS].sum()
+
+
+def compute_payroll(employee_df, month_summary, deduction_df, holidays_df, year, month):
+    """One payroll row per employee in ``employee_df`` for the given month.
+
+    ``Has Summary`` marks employees with attendance rows in ``month_summary``;
+    ``Attendance Paid`` is False for the fixed-salary employee types.
+    """
+    cal = month_calendar(year, month, holidays_df)
+    counts = attendance_counts(month_summary, cal["holiday_dates"])
+
+    payroll = employee_df.copy()
+    payroll["Employee Name"] = payroll["Employee Name"].astype(str)
+    for col in RATE_COLS:
+        payroll[col] = pd.to_numeric(payroll[col], errors='coerce').fillna(0.0)
+
+    payroll["Has Summary"] = payroll["Employee Name"].isin(counts.index)
+    payroll = payroll.join(counts, on="Employee Name")
+    payroll[COUNT_COLS] = payroll[COUNT_COLS].fillna(0).astype(int)
+
+    month_deductions = deduction_df[
+        (deduction_df["Year"] == year) & (deduction_df["Month"] == month)
+    ].drop_duplicates("Employee Name").assign(**{"Employee Name": lambda d: d["Employee Name"].astype(str)})
+    month_deductions = month_deductions.set_index("Employee Name")
+    payroll["Advance"] = payroll["Employee Name"].map(month_deductions["Monthly Advanced"]).fillna(0.0)
+    payroll["Loan"] = payroll["Employee Name"].map(month_deductions["Monthly Loan Deduction"]).fillna(0.0)
+
+    payroll["EPF 8%"] = (payroll["Salary for EPF"] * EPF_EMPLOYEE_RATE).round(2)
+    payroll["EPF 12%"] = (payroll["Salary for EPF"] * EPF_EMPLOYER_RATE).round(2)
+    payroll["ETF 3%"] = (payroll["Salary for EPF"] * ETF_RATE).round(2)
+
+    attendance_paid = ~payroll["Employee Type"].isin(FIXED_SALARY_TYPES)
+    payroll["Attendance Paid"] = attendance_paid
+
+    normal_rate = payroll["Normal Pay Rate"]
+    sunday_rate = payroll["Sunday Pay Rate"]
+    payroll["Base Salary"] = np.where(
+        attendance_paid,
+        payroll["Full Days"] * normal_rate + payroll["Half Days"] * normal_rate / 2,
+        payroll["Salary for EPF"],
+    )
+    payroll["Sunday Pay"] = np.where(
+        attendance_paid,
+        payroll["Sunday Full"] * sunday_rate + payroll["Sunday Half"] * sunday_rate / 2,
+        0.0,
+    )
+    payroll["OT Pay"] = np.where(
+        attendance_paid, payroll["Weekday OT Hours"] * payroll["Overtime Pay Hourly Rate"], 0.0
+    )
+    earned_bonus = payroll["Full Days"] >= cal["bonus_threshold"]
+    payroll["Bonus"] = np.where(attendance_paid & ~earned_bonus, 0.0, payroll["Attendance Bonus"])
+
+    payroll["Gross Salary"] = (
+        payroll["Base Salary"] + payroll["OT Pay"] + payroll["Sunday Pay"] + payroll["Bonus"]
+        + payroll["Other Allowances"] + payroll["Meal Allowance"]
+    )
+    payroll["Net Salary"] = payroll["Gross Salary"] - payroll["Advance"] - payroll["Loan"] - payroll["EPF 8%"]
+    return payroll.reset_index(drop=True)
+
+
+REGISTER_COLS = ["Employee Name", "Employee Type", "EPF No", "Full Days", "Half Days", "Sunday Full",
+                 "Sunday Half", "Weekday OT Hours", "Base Salary", "OT Pay", "Sunday Pay", "Bonus",
+                 "Other Allowances", "Meal Allowance", "Gross Salary", "Advance", "Loan", "EPF 8%",
+                 "Net Salary", "EPF 12%", "ETF 3%"]
+
+
+def payroll_register(payroll_df):
+    """The payroll register: employees with attendance for the month, in register column order."""
+    register = payroll_df[payroll_df["Has Summary"]]
+    return register.reindex(columns=REGISTER_COLS).sort_values("Employee Name").reset_index(drop=True)
+
+
+TOTAL_COLS = ["Gross Salary", "Advance", "Loan", "EPF 8%", "Net Salary", "EPF 12%", "ETF 3%"]
+
+
+def payroll_totals(payroll_df, group_field, groups=None):
+    """Headcount and ``TOTAL_COLS`` sums per ``group_field`` for the employees with attendance.
+
+    ``groups`` fixes the rows (in order), with zeros for groups nobody was paid in.
+    """
+    paid = payroll_df[payroll_df["Has Summary"]]
+    by_group = paid.groupby(group_field, dropna=False)
+    totals = by_group[TOTAL_COLS].sum()
+    totals.insert(0, "Employees", by_group.size())
+    if groups is not None:
+        totals = totals.reindex(groups, fill_value=0)
+    return totals.rename_axis(group_field).reset_index()
@@ -0,0 +1,43 @@
+"""Background prefetch of keyed results.
+
+``BackgroundCache`` runs ``fn(*args)`` on a worker thread the first time a
+key is asked for and keeps the most recent results, so a page can start
+building the next page while the current one is on screen.
+
+Every cache submits to one module-level executor, so the number of prefetch
+threads stays fixed however many caches (or sessions) there are.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+class BackgroundCache:
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prefetch(self, key, fn, *args):
+        """Start computing ``key`` in the background unless it is already cached or running."""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = _executor.submit(fn, *args)
+                self._futures[key] = future
+            self._futures.move_to_end(key)
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+        return future
+
+    def get(self, key, fn, *args):
+        """The result for ``key``, waiting for a prefetch in flight or computing it now."""
+        return self.prefetch(key, fn, *args).result()
+
+    def clear(self):
+        with self._lock:
+            self._futures.clear()
@@ -0,0 +1,193 @@
+"""Server-side PDF rendering of salary slips.
+
+Draws the two slip formats (format1 above format2, as on the Print pages)
+three employees across, as many rows per A4 page as fit, with ``reportlab``.
+Pages are written straight to a file so a large run never builds one big
+HTML string in the browser.
+"""
+import os
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from salarycalc.slips import COMPANY_NAME, payroll_records
+
+SLIPS_ROOT = "data/salary_slips"
+
+SETS_PER_ROW = 3
+SLIP_WIDTH = 5 * cm
+PAGE_MARGIN = 1 * cm
+SLIP_GAP = 0.4 * cm
+PADDING = 5
+FONT_SIZE = 7
+TITLE_SIZE = 9.5
+LEADING = 8.5
+RULE_SPACE = 5
+
+
+def slips_path(year, month):
+    return os.path.join(SLIPS_ROOT, str(year), f"{month}_{year}.pdf")
+
+
+def _money(value):
+    return f"{value:,.2f}"
+
+
+def slip_layouts(record):
+    """The (format1, format2) line layouts for one slip record (see ``slips.slip_record``).
+
+    A line is ``("row", label, value, bold)``, ``("rule", style)`` with
+    style ``"solid"``, ``"dashed"`` or ``"net"``, or ``("title", text)``.
+    """
+    ot_label = f"OT ({record['weekday_overtime']:.2f} × {record['overtime_hourly']})"
+
+    employee = [("row", "Employee", str(record["employee"]), True)]
+    additions = [
+        ("row", ot_label, _money(record["ot_pay"]), False),
+        ("row", "Sunday Pay", _money(record["sunday_pay"]), False),
+        ("row", "Attendance Bonus", _money(record["bonus"]), False),
+        ("row", "Other Allowances", _money(record["other_allow"]), False),
+    ]
+    deductions = [
+        ("row", "Gross Salary", _money(record["gross"]), True),
+        ("row", "Meal Allowance", _money(record["meal"]), False),
+        ("row", "Advance", _money(record["advance"]), False),
+        ("row", "Loan", _money(record["loan"]), False),
+        ("row", "EPF 8%", _money(record["epf_8"]), False),
+    ]
+    net = [("rule", "net"), ("row", "Net Salary", _money(record["net"]), True)]
+
+    format1 = [
+        *employee,
+        ("rule", "solid"),
+        ("row", "Salary per Day", _money(record["normal_rate"]), False),
+        ("row", "Full Days", str(record["full_days"]), False),
+        ("row", "Half Days", str(record["half_days"]), False),
+        ("rule", "solid"),
+        ("row", "Base Salary", _money(record["base_salary"]), True),
+        *additions,
+        ("rule", "solid"),
+        *deductions,
+        *net,
+    ]
+    format2 = [
+        ("title", COMPANY_NAME),
+        ("row", f"{record['month']} - {record['year']}", f"EPF No: {record['epf_no']}", False),
+        ("rule", "solid"),
+        *employee,
+        ("rule", "solid"),
+        ("row", "Basic Salary", _money(record["basic_salary"]), False),
+        ("row", "BRA", _money(record["bra"]), False),
+        ("rule", "dashed"),
+        ("row", "Salary For EPF", _money(record["salary_for_epf"]), True),
+        ("rule", "solid"),
+        *additions,
+        ("rule", "solid"),
+        *deductions,
+        *net,
+        ("rule", "solid"),
+        ("row", "EPF 12%", _money(record["epf_12"]), False),
+        ("row", "ETF 3%", _money(record["etf_3"]), False),
+    ]
+    return format1, format2
+
+
+def _line_height(line):
+    if line[0] == "title":
+        return TITLE_SIZE + 6
+    if line[0] == "rule":
+        return RULE_SPACE
+    return LEADING
+
+
+def slip_height(layout):
+    return sum(_line_height(line) for line in layout) + 2 * PADDING
+
+
+def _fit(text, font, max_width):
+    """Trim ``text`` with an ellipsis so it fits in ``max_width`` points."""
+    if stringWidth(text, font, FONT_SIZE) <= max_width:
+        return text
+    while text and stringWidth(text + "…", font, FONT_SIZE) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+def draw_slip(pdf, layout, x, top):
+    """Draw one slip with its top-left corner at (x, top). Returns its height."""
+    height = slip_height(layout)
+    pdf.setStrokeColorRGB(0.8, 0.8, 0.8)
+    pdf.setLineWidth(0.75)
+    pdf.roundRect(x, top - height, SLIP_WIDTH, height, 4)
+
+    left, right = x + PADDING, x + SLIP_WIDTH - PADDING
+    y = top - PADDING
+    for line in layout:
+        kind = line[0]
+        if kind == "title":
+            y -= TITLE_SIZE + 2
+            pdf.setFont("Helvetica-Bold", TITLE_SIZE)
+            pdf.drawCentredString(x + SLIP_WIDTH / 2, y, line[1])
+            y -= 4
+        elif kind == "rule":
+            y -= RULE_SPACE / 2
+            style = line[1]
+            if style == "net":
+                pdf.setStrokeColorRGB(0, 0, 0)
+                pdf.setLineWidth(1.5)
+            elif style == "dashed":
+                pdf.setStrokeColorRGB(0.53, 0.53, 0.53)
+                pdf.setLineWidth(0.75)
+                pdf.setDash(2, 2)
+            else:
+                pdf.setStrokeColorRGB(0.87, 0.87, 0.87)
+                pdf.setLineWidth(0.75)
+            pdf.line(left, y, right, y)
+            pdf.setDash()
+            y -= RULE_SPACE / 2
+        else:
+            _, label, value, bold = line
+            font = "Helvetica-Bold" if bold else "Helvetica"
+            y -= LEADING
+            value_width = stringWidth(value, font, FONT_SIZE)
+            pdf.setFont(font, FONT_SIZE)
+            pdf.drawRightString(right, y + 2, value)
+            pdf.drawString(left, y + 2, _fit(label, font, right - left - value_width - 4))
+    return height
+
+
+def render_slips_pdf(payroll_df, year, month, path=None, on_progress=None):
+    """Write the slips for every row of ``payroll_df`` to ``path`` as a paginated PDF.
+
+    ``on_progress(done, total)`` is called as employees are drawn. Returns the
+    path written.
+    """
+    path = path or slips_path(year, month)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    page_width, page_height = A4
+    column_step = (page_width - 2 * PAGE_MARGIN - SLIP_WIDTH) / (SETS_PER_ROW - 1)
+    pdf = canvas.Canvas(path, pagesize=A4, pageCompression=1)
+    pdf.setTitle(f"Salary Slips - {month} {year}")
+
+    sets = [slip_layouts(record) for record in payroll_records(payroll_df, year, month)]
+    total = len(sets)
+    top = page_height - PAGE_MARGIN
+    for start in range(0, total, SETS_PER_ROW):
+        row = sets[start:start + SETS_PER_ROW]
+        row_height = max(slip_height(f1) + SLIP_GAP + slip_height(f2) for f1, f2 in row)
+        if top - row_height < PAGE_MARGIN and top < page_height - PAGE_MARGIN:
+            pdf.showPage()
+            top = page_height - PAGE_MARGIN
+        for column, (format1, format2) in enumerate(row):
+            x = PAGE_MARGIN + column * column_step
+            height = draw_slip(pdf, format1, x, top)
+            draw_slip(pdf, format2, x, top - height - SLIP_GAP)
+        top -= row_height + SLIP_GAP
+        if on_progress is not None:
+            on_progress(min(start + SETS_PER_ROW, total), total)
+
+    pdf.save()
+    return path
@@ -0,0 +1,231 @@
+"""Salary slip HTML templates.
+
+The two slip formats are parsed once at import into literal text and
+``(field, format spec)`` slots, so rendering a slip is a single join over
+prepared parts. Documents emit the shared stylesheet once, however many
+slips they hold.
+"""
+from string import Formatter
+
+COMPANY_NAME = "Darshana Enterprises"
+
+SLIP_CSS = """
+    .slip-set {
+        display: inline-block;
+        width: 5.2cm;
+        min-width: 5.2cm;
+        max-width: 5.3cm;
+        vertical-align: top;
+        margin: 0 0.4cm 20px 0.4cm;
+    }
+    .slip {
+        width: 5cm;
+        height: auto;
+        padding: 8px;
+        border: 1px solid #ccc;
+        border-radius: 6px;
+        font-size: 11px;
+        margin-bottom: 20px;
+        font-family: 'Segoe UI', 'Helvetica Neue', sans-serif;
+        box-shadow: 0 1px 4px rgba(0,0,0,0.1);
+        background: white;
+        box-sizing: border-box;
+    }
+    .slip h3, .slip h5 {
+        text-align: center;
+        margin: 6px 0;
+        font-size: 13px;
+        font-weight: 600;
+    }
+    .slip table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+    .slip td {
+        padding: 2px 0;
+        vertical-align: top;
+    }
+    .slip hr {
+        border: none;
+        border-top: 1px solid #ddd;
+        margin: 6px 0;
+    }
+    .net-box {
+        border-top: 2px solid #000;
+        padding-top: 4px;
+        font-weight: bold;
+        font-size: 12px;
+    }
+    .print-button { margin-bottom:20px; }
+    @media print {
+        .print-button { display: none; }
+        .slip-set { page-break-inside: avoid; }
+        body { background:white !important; }
+    }
+    body { background:white !important; }
+"""
+
+PRINT_ALL_BUTTON = """<div class='print-button' style='margin-bottom:20px;'>
+<a href="javascript:window.print()" style="padding:8px 20px; background:#28a745; color:white; text-decoration:none; border-radius:4px; font-size:16px;">🖨️ Print All</a></div>
+"""
+
+
+class SlipTemplate:
+    """A slip format parsed once into literal text and ``(field, format spec)`` slots."""
+
+    def __init__(self, source):
+        self._parts = [(literal, field, spec) for literal, field, spec, _ in Formatter().parse(source)]
+
+    def render(self, record):
+        out = []
+        for literal, field, spec in self._parts:
+            out.append(literal)
+            if field is not None:
+                out.append(format(record[field], spec))
+        return "".join(out)
+
+
+_EARNINGS = """
+            <table>
+                <tr><td>OT ({weekday_overtime:.2f} × {overtime_hourly})</td><td align='right'>{ot_pay:,.2f}</td></tr>
+                <tr><td>Sunday Pay</td><td align='right'>{sunday_pay:,.2f}</td></tr>
+                <tr><td>Attendance Bonus</td><td align='right'>{bonus:,.2f}</td></tr>
+                <tr><td>Other Allowances</td><td align='right'>{other_allow:,.2f}</td></tr>
+            </table>"""
+
+_DEDUCTIONS_AND_NET = """
+            <table>
+                <tr><td><strong>Gross Salary</strong></td><td align='right'><strong>{gross:,.2f}</strong></td></tr>
+                <tr><td>Meal Allowance</td><td align='right'>{meal:,.2f}</td></tr>
+                <tr><td>Advance</td><td align='right'>{advance:,.2f}</td></tr>
+                <tr><td>Loan</td><td align='right'>{loan:,.2f}</td></tr>
+                <tr><td>EPF 8%</td><td align='right'>{epf_8:,.2f}</td></tr>
+            </table>
+            <hr>
+            <table class='net-box'>
+                <tr><td><strong>Net Salary</strong></td><td align='right'><strong>{net:,.2f}</strong></td></tr>
+            </table>"""
+
+_SALARY_FOR_EPF = """
+            <table>
+                <tr><td>Basic Salary</td><td align='right'>{basic_salary:,.2f}</td></tr>
+                <tr><td>BRA</td><td align='right'>{bra:,.2f}</td></tr>
+            </table>
+            <hr style="border-top: 1px dashed #888;">
+            <table>
+                <tr><td><strong>Salary For EPF</strong></td><td align='right'><strong>{salary_for_epf:,.2f}</strong></td></tr>
+            </table>
+            <hr>""" + _EARNINGS + """
+            <hr>""" + _DEDUCTIONS_AND_NET + """
+            <hr>
+            <table>
+                <tr><td>EPF 12%</td><td align='right'>{epf_12:,.2f}</td></tr>
+                <tr><td>ETF 3%</td><td align='right'>{etf_3:,.2f}</td></tr>
+            </table>
+        </div>
+        """
+
+FORMAT1 = SlipTemplate("""
+        <div class='slip'>
+            <table>
+                <tr><td><strong>Employee</strong></td><td align='right'><strong>{employee}</strong></td></tr>
+            </table>
+            <hr>
+            <table>
+                <tr><td>Salary per Day</td><td align='right'>{normal_rate:,.2f}</td></tr>
+                <tr><td>Full Days</td><td align='right'>{full_days}</td></tr>
+                <tr><td>Half Days</td><td align='right'>{half_days}</td></tr>
+            </table>
+            <hr>
+            <table>
+                <tr><td><strong>Base Salary</strong></td><td align='right'><strong>{base_salary:,.2f}</strong></td></tr>
+            </table>""" + _EARNINGS + """
+            <hr>""" + _DEDUCTIONS_AND_NET + """
+        </div>
+        """)
+
+FORMAT2 = SlipTemplate("""
+        <div class='slip'>
+            <h3>""" + COMPANY_NAME + """</h3>
+            <table>
+                <tr><td>{month} - {year}</td><td align='right'>EPF No: <strong>{epf_no}</strong></td></tr>
+            </table>
+            <hr>
+            <table>
+                <tr><td><strong>Employee</strong></td><td align='right'><strong>{employee}</strong></td></tr>
+            </table>
+            <hr>""" + _SALARY_FOR_EPF)
+
+# Manual entries have a designation instead of a pay month
+CUSTOM_FORMAT2 = SlipTemplate("""
+        <div class='slip'>
+            <h3>""" + COMPANY_NAME + """</h3>
+            <table>
+                <tr><td><strong>Employee</strong></td><td align='right'><strong>{employee}</strong></td></tr>
+                <tr><td>Designation</td><td align='right'>{designation}</td></tr>
+                <tr><td>EPF No:</td><td align='right'><b>{epf_no}</b></td></tr>
+            </table>
+            <hr>""" + _SALARY_FOR_EPF)
+
+
+def slip_record(pay, year, month):
+    """Slip fields for one ``compute_payroll`` row (a Series or dict)."""
+    # For neatness in slip display, fixed-salary types show no attendance
+    attendance_paid = pay["Attendance Paid"]
+    return {
+        "employee": pay["Employee Name"],
+        "month": month,
+        "year": year,
+        "epf_no": pay["EPF No"] if "EPF No" in pay else "N/A",
+        "normal_rate": pay["Normal Pay Rate"],
+        "full_days": pay["Full Days"] if attendance_paid else 0,
+        "half_days": pay["Half Days"] if attendance_paid else 0,
+        "weekday_overtime": pay["Weekday OT Hours"] if attendance_paid else 0,
+        "overtime_hourly": pay["Overtime Pay Hourly Rate"],
+        "basic_salary": pay["Basic Salary"],
+        "bra": pay["BRA"],
+        "salary_for_epf": pay["Salary for EPF"],
+        "base_salary": pay["Base Salary"],
+        "ot_pay": pay["OT Pay"],
+        "sunday_pay": pay["Sunday Pay"],
+        "bonus": pay["Bonus"],
+        "other_allow": pay["Other Allowances"],
+        "meal": pay["Meal Allowance"],
+        "gross": pay["Gross Salary"],
+        "advance": pay["Advance"],
+        "loan": pay["Loan"],
+        "epf_8": pay["EPF 8%"],
+        "epf_12": pay["EPF 12%"],
+        "etf_3": pay["ETF 3%"],
+        "net": pay["Net Salary"],
+    }
+
+
+def payroll_records(payroll_df, year, month):
+    """Slip records for every row of a ``compute_payroll`` frame, in row order."""
+    return [slip_record(pay, year, month) for pay in payroll_df.to_dict("records")]
+
+
+def render_slips(record, formats=(FORMAT1, FORMAT2)):
+    return "".join(template.render(record) for template in formats)
+
+
+def render_slip_sets(records, per_row=3):
+    """Both formats of each record as a slip set, ``per_row`` sets to a print row."""
+    html_blocks = [f"<div class='slip-set'>{render_slips(record)}</div>" for record in records]
+    rows = []
+    for i in range(0, len(html_blocks), per_row):
+        row = "<div style='width:100%; display:flex; flex-direction:row; justify-content:space-between; margin-bottom:10px;'>"
+        row += "".join(html_blocks[i:i + per_row])
+        row += "</div>"
+        rows.append(row)
+    return "".join(rows)
+
+
+def stylesheet(extra_css=""):
+    return f"\n<style>{SLIP_CSS}{extra_css}</style>\n"
+
+
+def document(body, extra_css=""):
+    """``body`` preceded by the slip stylesheet (emitted once per document)."""
+    return stylesheet(extra_css) + body
@@ -0,0 +1,323 @@
+"""Monthly summary storage backends.
+
+``csv`` (the default) is the per-employee tree under data/monthly_summary.
+``parquet`` keeps each month as one typed file,
+data/monthly_store/{year}/{month}.parquet, so a whole month loads with a
+single read. It needs ``pyarrow`` and is selected with the
+``SALARYCALC_STORE=parquet`` environment variable.
+``sqlite`` keeps the rows in the ``summaries`` table of data/salarycalc.db,
+indexed on (Year, Month, Name), so one month or one employee is one indexed
+query (see ``salarycalc.db``).
+
+``summary_token`` changes whenever a month's summaries are rewritten on any
+backend, so caches derived from them know when to recompute.
+"""
+import glob
+import hashlib
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from salarycalc import db
+from salarycalc.attendance import SUMMARY_COLS
+from salarycalc.export import SUMMARY_ROOT, export_monthly_summaries, summary_path
+
+STORE_ROOT = "data/monthly_store"
+SUMMARY_TABLE = "summaries"
+SUMMARY_TABLE_COLS = SUMMARY_COLS + ["Year", "Month"]
+VERSION_TABLE = "summary_versions"
+VERSION_TABLE_COLS = ["Year", "Month", "Version"]
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def active_backend():
+    """The configured backend, falling back to csv when pyarrow is missing."""
+    if db.enabled():
+        return "sqlite"
+    if db.configured_store() == "parquet" and parquet_available():
+        return "parquet"
+    return "csv"
+
+
+def month_path(year, month, root=STORE_ROOT):
+    return os.path.join(root, str(year), f"{month}.parquet")
+
+
+def _typed(summary_df):
+    """Apply the summary column types (shared by both backends)."""
+    summary_df = summary_df.copy()
+    for col in SUMMARY_COLS:
+        if col not in summary_df.columns:
+            summary_df[col] = ''
+    summary_df['Date'] = pd.to_datetime(summary_df['Date'], errors='coerce')
+    summary_df['Name'] = summary_df['Name'].astype(str)
+    summary_df['Day'] = summary_df['Day'].astype(str)
+    for col in ['Work Time', 'Clock In', 'Clock Out']:
+        summary_df[col] = summary_df[col].fillna('').astype(str)
+    summary_df['Absent'] = summary_df['Absent'].astype(str).str.strip().str.lower().isin(['true', '1'])
+    summary_df['ATT_Time'] = pd.to_numeric(summary_df['ATT_Time'], errors='coerce').fillna(0.0)
+    for col in ['RND(ATT_Time)', 'OT Time']:
+        summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce').fillna(0).astype(int)
+    summary_df['Real Day'] = pd.to_numeric(summary_df['Real Day'], errors='coerce').fillna(0.0)
+    return summary_df[SUMMARY_COLS]
+
+
+def write_month_partitions(normalized_df, root=STORE_ROOT):
+    """Write one Parquet file per (Year, Month). Returns ``(files_written, rows_written)``."""
+    files_written = 0
+    rows_written = 0
+    for (year, month), group in normalized_df.groupby(['Year', 'Month'], sort=False, observed=True):
+        path = month_path(year, month, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _typed(group).sort_values(['Name', 'Date'], kind='stable').to_parquet(path, index=False)
+        files_written += 1
+        rows_written += len(group)
+    return files_written, rows_written
+
+
+def _ensure_summary_table(conn):
+    db.ensure_table(
+        conn, SUMMARY_TABLE, SUMMARY_TABLE_COLS, indexes=[["Year", "Month", "Name"]], real_cols=["ATT_Time", "Real Day"]
+    )
+
+
+def _touch_months(conn, months):
+    """Stamp a new version on each (year, month) whose SQLite summary rows were rewritten."""
+    db.ensure_table(conn, VERSION_TABLE, VERSION_TABLE_COLS, key=["Year", "Month"])
+    version = time.time_ns()
+    db.upsert(conn, VERSION_TABLE, VERSION_TABLE_COLS, ["Year", "Month"],
+              [(int(year), str(month), version) for year, month in set(months)])
+
+
+def _sql_summary_rows(normalized_df):
+    typed = _typed(normalized_df).assign(Year=normalized_df['Year'], Month=normalized_df['Month'])
+    return db.rows_of(typed, SUMMARY_TABLE_COLS)
+
+
+def write_sql_summaries(normalized_df, conn=None):
+    """Replace the SQLite rows of every (Name, Year, Month) in ``normalized_df`` in one transaction.
+
+    Returns ``(employee_months_written, rows_written)``.
+    """
+    keys = list(normalized_df[['Name', 'Year', 'Month']].drop_duplicates().itertuples(index=False, name=None))
+    if conn is None:
+        with db.transaction() as conn:
+            return write_sql_summaries(normalized_df, conn)
+    _ensure_summary_table(conn)
+    db.delete(conn, SUMMARY_TABLE, ['Name', 'Year', 'Month'], [(str(n), int(y), str(m)) for n, y, m in keys])
+    db.insert(conn, SUMMARY_TABLE, SUMMARY_TABLE_COLS, _sql_summary_rows(normalized_df))
+    _touch_months(conn, [(year, month) for _, year, month in keys])
+    return len(keys), len(normalized_df)
+
+
+def sql_summary_keys():
+    """The (Name, Year, Month) keys with rows in the SQLite summaries table, as "name|year|month"."""
+    keys = db.read_table(SUMMARY_TABLE, ['Name', 'Year', 'Month'], 'GROUP BY "Name", "Year", "Month"')
+    return {f"{name}|{year}|{month}" for name, year, month in keys.itertuples(index=False)}
+
+
+class SummaryAppender:
+    """Appends normalized attendance chunks to the monthly summaries of the active backend.
+
+    Output is staged until ``commit``: CSV and Parquet files are written to
+    ``<file>.tmp`` and swapped in together, and SQLite rows stay in one open
+    transaction. A file touched for the first time in this run is started
+    fresh and later chunks append to it, so only one chunk is held in memory
+    at a time. Leaving the ``with`` block on an error (or without a commit)
+    discards everything staged, and the existing summaries are untouched.
+    """
+
+    def __init__(self):
+        self.backend = active_backend()
+        self.rows_written = 0
+        self._started = set()
+        self._writers = {}
+        self._conn = None
+        self._committed = False
+
+    @property
+    def files_written(self):
+        return len(self._started)
+
+    def write(self, normalized_df):
+        if self.backend == "parquet":
+            self._write_parquet(normalized_df)
+        elif self.backend == "sqlite":
+            self._write_sql(normalized_df)
+        else:
+            self._write_csv(normalized_df)
+        self.rows_written += len(normalized_df)
+
+    def _write_csv(self, normalized_df):
+        groups = normalized_df.groupby(['Name', 'Year', 'Month'], sort=False, observed=True)
+        for (emp, year, month), group in groups:
+            path = summary_path(emp, year, month)
+            first = path not in self._started
+            if first:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._started.add(path)
+            group.reindex(columns=SUMMARY_COLS, fill_value='').to_csv(
+                path + ".tmp", mode='w' if first else 'a', header=first, index=False
+            )
+
+    def _write_parquet(self, normalized_df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for (year, month), group in normalized_df.groupby(['Year', 'Month'], sort=False, observed=True):
+            path = month_path(year, month)
+            table = pa.Table.from_pandas(_typed(group), preserve_index=False)
+            if path not in self._writers:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._writers[path] = pq.ParquetWriter(path + ".tmp", table.schema)
+                self._started.add(path)
+            writer = self._writers[path]
+            writer.write_table(table.cast(writer.schema))
+
+    def _write_sql(self, normalized_df):
+        if self._conn is None:
+            self._conn = db.connect()
+        _ensure_summary_table(self._conn)
+        keys = normalized_df[['Name', 'Year', 'Month']].drop_duplicates().itertuples(index=False, name=None)
+        first = [(str(n), int(y), str(m)) for n, y, m in keys if (n, y, m) not in self._started]
+        db.delete(self._conn, SUMMARY_TABLE, ['Name', 'Year', 'Month'], first)
+        self._started.update(first)
+        db.insert(self._conn, SUMMARY_TABLE, SUMMARY_TABLE_COLS, _sql_summary_rows(normalized_df))
+        _touch_months(self._conn, normalized_df[['Year', 'Month']].drop_duplicates().itertuples(index=False))
+
+    def _close_writers(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def commit(self):
+        """Publish everything written so far."""
+        self._close_writers()
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+        elif self.backend != "sqlite":
+            for path in self._started:
+                os.replace(path + ".tmp", path)
+        self._committed = True
+
+    def abort(self):
+        """Discard everything written since the appender was opened."""
+        self._close_writers()
+        if self._conn is not None:
+            self._conn.rollback()
+            self._conn.close()
+            self._conn = None
+        elif self.backend != "sqlite":
+            for path in self._started:
+                if os.path.exists(path + ".tmp"):
+                    os.remove(path + ".tmp")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self._committed:
+            self.abort()
+
+
+def save_monthly_summaries(normalized_df, backend=None):
+    """Write the monthly summaries with ``backend`` (default: the active backend)."""
+    backend = backend or active_backend()
+    if backend == "parquet":
+        return write_month_partitions(normalized_df)
+    if backend == "sqlite":
+        return write_sql_summaries(normalized_df)
+    return export_monthly_summaries(normalized_df)
+
+
+def clear_summaries():
+    """Remove the monthly summaries of every backend."""
+    for root in (SUMMARY_ROOT, STORE_ROOT):
+        if os.path.exists(root):
+            shutil.rmtree(root)
+    if os.path.exists(db.DB_FILE):
+        with db.transaction() as conn:
+            db.clear_table(conn, SUMMARY_TABLE)
+            db.clear_table(conn, VERSION_TABLE)
+
+
+def migrate_summaries_to_sqlite():
+    """Copy every exported CSV summary into the SQLite summaries table in one transaction."""
+    files = sorted(glob.glob(os.path.join(SUMMARY_ROOT, "*", "*", "*.csv")))
+    rows = 0
+    with db.transaction() as conn:
+        _ensure_summary_table(conn)
+        db.clear_table(conn, SUMMARY_TABLE)
+        months = []
+        for path in files:
+            year, month = path.split(os.sep)[-3:-1]
+            summary_df = pd.read_csv(path).assign(Year=int(year), Month=month)
+            db.insert(conn, SUMMARY_TABLE, SUMMARY_TABLE_COLS, _sql_summary_rows(summary_df))
+            months.append((year, month))
+            rows += len(summary_df)
+        _touch_months(conn, months)
+    return len(files), rows
+
+
+def summary_token(year, month):
+    """A cheap token that changes whenever the month's summaries are rewritten ("" if there are none)."""
+    backend = active_backend()
+    if backend == "sqlite":
+        versions = db.read_table(VERSION_TABLE, ["Version"], 'WHERE "Year" = ? AND "Month" = ?', (year, month))
+        return "" if versions.empty else str(versions["Version"].iloc[0])
+    if backend == "parquet" and os.path.exists(month_path(year, month)):
+        stat = os.stat(month_path(year, month))
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    month_dir = os.path.join(SUMMARY_ROOT, str(year), month)
+    if not os.path.isdir(month_dir):
+        return ""
+    files = sorted(
+        (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+        for entry in os.scandir(month_dir) if entry.name.endswith(".csv")
+    )
+    return hashlib.sha1(repr(files).encode()).hexdigest() if files else ""
+
+
+def load_month_summary(year, month):
+    """All employees' summary rows for one month (empty frame if nothing was exported)."""
+    if active_backend() == "sqlite":
+        return _typed(db.read_table(
+            SUMMARY_TABLE, SUMMARY_COLS, 'WHERE "Year" = ? AND "Month" = ? ORDER BY "Name", "Date"', (year, month)
+        ))
+    if active_backend() == "parquet" and os.path.exists(month_path(year, month)):
+        return _typed(pd.read_parquet(month_path(year, month)))
+
+    files = sorted(glob.glob(os.path.join(SUMMARY_ROOT, str(year), month, "*.csv")))
+    if not files:
+        return _typed(pd.DataFrame(columns=SUMMARY_COLS))
+    return _typed(pd.concat([pd.read_csv(f) for f in files], ignore_index=True))
+
+
+def load_employee_summary(emp, year, month):
+    """One employee's summary rows for a month, or None if it was never exported."""
+    if active_backend() == "sqlite":
+        emp_df = db.read_table(
+            SUMMARY_TABLE, SUMMARY_COLS, 'WHERE "Year" = ? AND "Month" = ? AND "Name" = ? ORDER BY "Date"',
+            (year, month, emp),
+        )
+        return _typed(emp_df) if not emp_df.empty else None
+    if active_backend() == "parquet" and os.path.exists(month_path(year, month)):
+        emp_df = pd.read_parquet(month_path(year, month), filters=[('Name', '==', emp)])
+        return _typed(emp_df) if not emp_df.empty else None
+
+    path = summary_path(emp, year, month)
+    if not os.path.exists(path):
+        return None
+    return _typed(pd.read_csv(path))
@@ -0,0 +1,114 @@
+"""Per-stage timing of page reruns.
+
+Each page calls ``begin_rerun(page)`` at the top and wraps its load,
+normalize, compute and render steps in ``with stage("load") as s:``
+(setting ``s.rows`` when it knows them). The most recent reruns are kept in
+a ring buffer that the Diagnostics page reads.
+
+A stage costs two ``perf_counter`` calls and an append. Peak memory is only
+measured while tracing is switched on from the Diagnostics page, because
+``tracemalloc`` slows every allocation down.
+"""
+import datetime
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+MAX_RERUNS = 200
+STAGE_COLS = ["Rerun", "Page", "Started", "Stage", "Seconds", "Rows", "Peak MB"]
+
+_reruns = deque(maxlen=MAX_RERUNS)
+_lock = threading.Lock()
+_local = threading.local()
+_counter = 0
+
+
+class StageRecord:
+    __slots__ = ("name", "seconds", "rows", "peak_bytes")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = None
+        self.peak_bytes = None
+
+
+class Rerun:
+    __slots__ = ("number", "page", "started", "stages")
+
+    def __init__(self, number, page):
+        self.number = number
+        self.page = page
+        self.started = datetime.datetime.now()
+        self.stages = []
+
+    @property
+    def seconds(self):
+        return sum(record.seconds for record in self.stages)
+
+
+def begin_rerun(page):
+    """Start recording a rerun of ``page`` on this thread (stages until the next call belong to it)."""
+    global _counter
+    with _lock:
+        _counter += 1
+        rerun = Rerun(_counter, page)
+        _reruns.append(rerun)
+    _local.rerun = rerun
+    return rerun
+
+
+@contextmanager
+def stage(name):
+    """Time the block as stage ``name`` of the current rerun; yields the record so callers can set ``rows``."""
+    record = StageRecord(name)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        if tracing:
+            record.peak_bytes = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+        rerun = getattr(_local, "rerun", None)
+        if rerun is not None:
+            rerun.stages.append(record)
+
+
+def memory_tracing():
+    return tracemalloc.is_tracing()
+
+
+def set_memory_tracing(enabled):
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def recent_reruns():
+    """The buffered reruns, newest first."""
+    with _lock:
+        return list(reversed(_reruns))
+
+
+def stage_frame():
+    """One row per recorded stage of the buffered reruns, newest rerun first."""
+    rows = [
+        (rerun.number, rerun.page, rerun.started, record.name, record.seconds, record.rows,
+         None if record.peak_bytes is None else record.peak_bytes / 2**20)
+        for rerun in recent_reruns() for record in rerun.stages
+    ]
+    return pd.DataFrame(rows, columns=STAGE_COLS)
+
+
+def clear():
+    with _lock:
+        _reruns.clear()
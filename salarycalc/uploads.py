@@ -0,0 +1,115 @@
+"""Multi-file attendance uploads.
+
+Device exports arrive as one file per terminal per week, as CSV or XLSX.
+``merge_attendance_files`` parses them in a thread pool (workbooks through
+openpyxl's streaming read-only mode), checks each file has the columns the
+app needs, and merges the rows, with all their columns, into one attendance
+frame. Rows repeated across files (same AC-No., Name and Date) are kept
+once, from the file uploaded last.
+"""
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from salarycalc.attendance import ATTENDANCE_COLUMNS
+from salarycalc.data import ATTENDANCE_DATE_FORMAT
+from salarycalc.ingest import REQUIRED_COLS, validate_chunk
+
+UPLOAD_TYPES = ["csv", "xlsx"]
+DUPLICATE_KEY = ["AC-No.", "Name", "Date"]
+MAX_READ_WORKERS = 8
+
+
+def _file_name(source):
+    return os.path.basename(getattr(source, "name", str(source)))
+
+
+def _cell_text(value, col):
+    """One workbook cell as the text the CSV export would hold."""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.strftime(ATTENDANCE_DATE_FORMAT if col == "Date" else "%H:%M")
+    if isinstance(value, datetime.date):
+        return value.strftime(ATTENDANCE_DATE_FORMAT)
+    if isinstance(value, datetime.time):
+        return value.strftime("%H:%M")
+    if isinstance(value, datetime.timedelta):
+        hours, minutes = divmod(round(value.total_seconds() / 60), 60)
+        return f"{hours:02d}:{minutes:02d}"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _read_xlsx(source):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        keep = [(i, col) for i, col in enumerate(header) if col]
+        records = [
+            [_cell_text(row[i] if i < len(row) else None, col) for i, col in keep]
+            for row in rows if any(cell is not None for cell in row)
+        ]
+    finally:
+        workbook.close()
+    return pd.DataFrame(records, columns=[col for _, col in keep], dtype=object)
+
+
+def _read_csv(source):
+    return pd.read_csv(source, dtype=str)
+
+
+def read_attendance_file(source):
+    """Parse one uploaded CSV or XLSX (a path or file object) into text columns.
+
+    Every column is kept, so the device columns the app does not read are
+    saved with the merged attendance.
+
+    Raises ValueError naming the file when it is not CSV/XLSX or lacks a
+    required column.
+    """
+    name = _file_name(source)
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    if extension not in UPLOAD_TYPES:
+        raise ValueError(f"{name}: only {', '.join(UPLOAD_TYPES).upper()} files are supported")
+    df = _read_xlsx(source) if extension == "xlsx" else _read_csv(source)
+
+    missing = [col for col in REQUIRED_COLS if col not in df.columns]
+    if missing:
+        raise ValueError(f"{name} is missing column(s): {', '.join(missing)}")
+    return df.reindex(columns=[*df.columns, *(col for col in ATTENDANCE_COLUMNS if col not in df.columns)])
+
+
+def merge_attendance_files(sources, workers=None):
+    """Read ``sources`` concurrently and merge them into one de-duplicated attendance frame.
+
+    Returns ``(attendance_df, stats)``; the frame has Date parsed and
+    Day/Year/Month derived, ordered by employee (first seen) then date.
+    Raises ValueError for an unreadable file or when no row has a
+    DD/MM/YYYY date.
+    """
+    workers = max(1, min(workers or MAX_READ_WORKERS, len(sources)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(read_attendance_file, sources))
+
+    merged, rejected = validate_chunk(pd.concat(frames, ignore_index=True))
+    if merged.empty:
+        raise ValueError("No attendance rows with a DD/MM/YYYY date were found")
+    rows = len(merged)
+    merged = merged.drop_duplicates(DUPLICATE_KEY, keep="last")
+    employee = merged.groupby(DUPLICATE_KEY[:2], sort=False, dropna=False).ngroup()
+    order = np.lexsort((merged["Date"].to_numpy(), employee.to_numpy()))
+    merged = merged.iloc[order].reset_index(drop=True)
+    return merged, {
+        "files": len(sources),
+        "rows": len(merged),
+        "duplicates": rows - len(merged),
+        "rejected": rejected,
+    }
@@ -0,0 +1,85 @@
+"""Cached per-month working calendar.
+
+``month_calendar`` derives a compact record per month (day counts, the
+government holidays as a set and a day bitmask, and the attendance bonus
+threshold) once, and re-uses it while the holidays are unchanged. Entries
+are keyed on a content hash of the holiday rows, so editing holidays.csv
+(or its journal, or the SQLite table) gives the next caller a fresh record
+without any explicit invalidation.
+"""
+import calendar
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+BONUS_ALLOWED_MISSED_DAYS = 2
+MAX_CACHED_MONTHS = 64
+
+_HOLIDAY_KEY_COLS = ["Holiday Date", "Year", "Month"]
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def holidays_token(holidays_df):
+    """A content hash of the holiday rows; changes whenever a holiday is added, edited or removed."""
+    cols = [col for col in _HOLIDAY_KEY_COLS if col in holidays_df.columns]
+    if holidays_df.empty or not cols:
+        return 0
+    return int(pd.util.hash_pandas_object(holidays_df[cols].astype(str), index=False).sum())
+
+
+def _day_mask(days):
+    mask = 0
+    for day in days:
+        mask |= 1 << (day - 1)
+    return mask
+
+
+def _build_calendar(year, month, holidays_df):
+    month_num = list(calendar.month_name).index(month)
+    first_weekday, total_days = calendar.monthrange(year, month_num)
+    # Day d (1-based) is a Sunday when (first_weekday + d - 1) % 7 == 6
+    sundays = [day for day in range(1, total_days + 1) if (first_weekday + day - 1) % 7 == 6]
+
+    holiday_dates = pd.to_datetime(
+        holidays_df.loc[(holidays_df['Year'] == year) & (holidays_df['Month'] == month), 'Holiday Date'],
+        errors='coerce'
+    ).dropna().dt.normalize().drop_duplicates()
+    weekday_holidays = int((holiday_dates.dt.dayofweek < 5).sum())
+    in_month = holiday_dates[(holiday_dates.dt.year == year) & (holiday_dates.dt.month == month_num)]
+
+    total_weekdays = total_days - len(sundays)
+    return {
+        "month_num": month_num,
+        "total_days": total_days,
+        "total_sundays": len(sundays),
+        "total_weekdays": total_weekdays,
+        "holiday_dates": frozenset(holiday_dates.dt.date),
+        "holiday_mask": _day_mask(in_month.dt.day),
+        "sunday_mask": _day_mask(sundays),
+        "govt_weekday_holidays": weekday_holidays,
+        "govt_weekend_holidays": len(holiday_dates) - weekday_holidays,
+        "bonus_threshold": total_weekdays - weekday_holidays - BONUS_ALLOWED_MISSED_DAYS,
+    }
+
+
+def month_calendar(year, month, holidays_df):
+    """Day counts, government holidays and the attendance bonus threshold for a month.
+
+    ``holiday_mask`` and ``sunday_mask`` have bit ``d - 1`` set for day ``d``.
+    """
+    key = (int(year), month, holidays_token(holidays_df))
+    with _lock:
+        record = _cache.get(key)
+        if record is not None:
+            _cache.move_to_end(key)
+    if record is None:
+        record = _build_calendar(int(year), month, holidays_df)
+        with _lock:
+            _cache[key] = record
+            while len(_cache) > MAX_CACHED_MONTHS:
+                _cache.popitem(last=False)
+    return dict(record)
+
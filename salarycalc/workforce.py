@@ -0,0 +1,76 @@
+"""Whole-workforce attendance pivot for a month.
+
+``month_pivot`` normalizes one month of the processed attendance (the same
+rules as the exported summaries) and pivots it once into an employees x days
+frame of Real Day and OT hours. The result is cached per month and re-used
+until the attendance file is rewritten.
+"""
+import calendar
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from salarycalc.attendance import normalize_attendance
+from salarycalc.data import attendance_signature, load_attendance
+
+PIVOT_VALUES = ["Real Day", "OT Time"]
+EMPLOYEE_KEYS = ["Name", "AC-No."]
+TOTAL_LABELS = {"Real Day": "Days", "OT Time": "OT Hours"}
+MAX_CACHED_MONTHS = 24
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _build_pivot(year, month):
+    df = load_attendance()
+    if df is None:
+        return pd.DataFrame()
+    month_df = df[(df["Year"] == year) & (df["Month"] == month)]
+    if month_df.empty:
+        return pd.DataFrame()
+
+    normalized = normalize_attendance(month_df)
+    normalized["AC-No."] = normalized["AC-No."].fillna(0)
+    normalized["Date"] = normalized["Date"].dt.day
+    pivot = normalized.pivot_table(
+        index=EMPLOYEE_KEYS, columns="Date", values=PIVOT_VALUES, aggfunc="sum", fill_value=0, observed=True
+    )
+    days = range(1, calendar.monthrange(year, list(calendar.month_name).index(month))[1] + 1)
+    pivot = pivot.reindex(columns=pd.MultiIndex.from_product([PIVOT_VALUES, days]), fill_value=0)
+    for value, label in TOTAL_LABELS.items():
+        pivot[(value, label)] = pivot[value].sum(axis=1)
+    # Each value's days followed by its total
+    return pivot[[(value, column) for value in PIVOT_VALUES for column in [*days, TOTAL_LABELS[value]]]]
+
+
+def month_pivot(year, month):
+    """Employees x days of ``month``: Real Day and OT hours per day plus per-employee totals.
+
+    Columns are ``(value, day)`` pairs for days 1..N followed by
+    ``(value, "Days")``/``(value, "OT Hours")`` totals; rows are indexed by
+    (Name, AC-No.) so two employees sharing a name stay apart. Empty when the
+    month has no attendance.
+    """
+    key = (int(year), month, attendance_signature())
+    with _lock:
+        pivot = _cache.get(key)
+        if pivot is not None:
+            _cache.move_to_end(key)
+    if pivot is None:
+        pivot = _build_pivot(int(year), month)
+        with _lock:
+            _cache[key] = pivot
+            while len(_cache) > MAX_CACHED_MONTHS:
+                _cache.popitem(last=False)
+    return pivot.copy()
+
+
+def flat_pivot(pivot):
+    """``pivot`` with one level of columns ("Real Day 1", ..., "OT Hours") for export."""
+    flat = pivot.copy()
+    flat.columns = [
+        label if label in TOTAL_LABELS.values() else f"{value} {label}" for value, label in pivot.columns
+    ]
+    return flat.reset_index()
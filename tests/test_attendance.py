@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salarycalc.attendance import compact_attendance, normalize_attendance
+from salarycalc.bench.synthetic import make_attendance, make_employees, make_holidays, month_periods
+
+DERIVED_COLS = ["Clock In", "Clock Out", "Work Time", "ATT_Time", "RND(ATT_Time)", "OT Time", "Real Day"]
+
+
+# The row-wise helpers of the original Save All export, kept as the reference
+def _baseline_fix_clock_times(row):
+    clock_in = row['Clock In'].strip()
+    clock_out = row['Clock Out'].strip()
+    if clock_in in ["", "nan", "NaN"] and clock_out in ["", "nan", "NaN"]:
+        return pd.Series(["00:00", "00:00"])
+    if clock_in in ["", "nan", "NaN"]:
+        return pd.Series(["08:00", clock_out])
+    if clock_out in ["", "nan", "NaN"]:
+        return pd.Series([clock_in, "17:00"])
+    return pd.Series([clock_in, clock_out])
+
+
+def _baseline_time_to_float(tstr):
+    try:
+        h, m = map(int, tstr.split(":"))
+        return round(h + m / 60, 2)
+    except Exception:
+        return 0
+
+
+def _baseline_calc_ot(row):
+    try:
+        out_time = datetime.strptime(row['Clock Out'], "%H:%M")
+        std_out = datetime.strptime("17:00", "%H:%M")
+        if out_time > std_out:
+            return round((out_time - std_out).seconds / 3600)
+        return 0
+    except Exception:
+        return 0
+
+
+def _baseline_classify_real_day(att):
+    if att > 6.5:
+        return 1.0
+    elif 0 < att <= 6.5:
+        return 0.5
+    return 0.0
+
+
+def baseline_normalize(df):
+    emp_df = df.copy()
+    emp_df['Work Time'] = emp_df.get('Work Time', '0:00').fillna('0:00')
+    emp_df['Clock In'] = emp_df.get('Clock In', '08:00').fillna('08:00').astype(str)
+    emp_df['Clock Out'] = emp_df.get('Clock Out', '17:00').fillna('17:00').astype(str)
+    emp_df[['Clock In', 'Clock Out']] = emp_df.apply(_baseline_fix_clock_times, axis=1)
+    emp_df['ATT_Time'] = emp_df['Work Time'].apply(_baseline_time_to_float)
+    emp_df['RND(ATT_Time)'] = emp_df['ATT_Time'].round().astype(int)
+    emp_df['OT Time'] = emp_df.apply(_baseline_calc_ot, axis=1)
+    emp_df['Real Day'] = emp_df['ATT_Time'].apply(_baseline_classify_real_day)
+    return emp_df
+
+
+@pytest.fixture
+def attendance():
+    """Two synthetic months as read from the file (text columns, dates parsed)."""
+    rng = np.random.default_rng(0)
+    periods = month_periods(2, start_month=6)
+    employee_df = make_employees(8, rng)
+    df = make_attendance(employee_df, periods, make_holidays(periods, rng), rng).replace("", None)
+    df["Date"] = pd.to_datetime(df["Date"], format="%d/%m/%Y")
+    return df
+
+
+def _as_compared(df):
+    out = df[DERIVED_COLS].copy()
+    for col in ["Clock In", "Clock Out", "Work Time"]:
+        out[col] = out[col].astype(str)
+    out["ATT_Time"] = out["ATT_Time"].astype(float)
+    out["RND(ATT_Time)"] = out["RND(ATT_Time)"].astype(int)
+    out["OT Time"] = out["OT Time"].astype(int)
+    out["Real Day"] = out["Real Day"].astype(float)
+    return out.reset_index(drop=True)
+
+
+def test_text_path_matches_baseline(attendance):
+    pd.testing.assert_frame_equal(
+        _as_compared(normalize_attendance(attendance)), _as_compared(baseline_normalize(attendance))
+    )
+
+
+def test_typed_path_matches_text_path(attendance):
+    expected = _as_compared(normalize_attendance(attendance))
+    typed = normalize_attendance(compact_attendance(attendance))
+    pd.testing.assert_frame_equal(_as_compared(typed), expected)
+
+
+def test_missing_punches_match_baseline():
+    df = pd.DataFrame({
+        "Name": ["A"] * 6,
+        "Date": pd.to_datetime(["2025-06-0%d" % day for day in range(2, 8)]),
+        "Clock In": [None, "07:55", None, " 08:10 ", "nan", "09:00"],
+        "Clock Out": [None, None, "18:40", "17:29", "19:31", "16:30"],
+        "Work Time": [None, "08:05", "08:40", "07:19", "06:30", "07:30"],
+        "Absent": ["True", None, None, None, None, None],
+    })
+    expected = _as_compared(baseline_normalize(df))
+    pd.testing.assert_frame_equal(_as_compared(normalize_attendance(df)), expected)
+    pd.testing.assert_frame_equal(_as_compared(normalize_attendance(compact_attendance(df))), expected)
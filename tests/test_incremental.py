@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from salarycalc import data, db
+from salarycalc.bench.synthetic import generate_dataset
+from salarycalc.data import load_attendance
+from salarycalc.export import summary_path
+from salarycalc.incremental import save_changed_summaries
+from salarycalc.store import SUMMARY_TABLE, load_month_summary, month_path, parquet_available
+
+BACKENDS = ["csv", "sqlite", pytest.param("parquet", marks=pytest.mark.skipif(
+    not parquet_available(), reason="pyarrow is not installed"))]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SALARYCALC_STORE", request.param)
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "data" / "salarycalc.db"))
+    generate_dataset(str(tmp_path), employees=5, months=2)
+    data.invalidate()
+    yield request.param
+    data.invalidate()
+
+
+def _remove_output(backend, name, year, month):
+    if backend == "sqlite":
+        with db.transaction() as conn:
+            db.delete(conn, SUMMARY_TABLE, ["Name", "Year", "Month"], [(name, year, month)])
+    else:
+        os.remove(month_path(year, month) if backend == "parquet" else summary_path(name, year, month))
+
+
+def test_unchanged_months_are_skipped(backend):
+    df = load_attendance()
+    slices = df.groupby(["AC-No.", "Year", "Month"], observed=True).ngroups
+    first = save_changed_summaries(df)
+    assert first["changed"] == slices and first["files"] > 0
+
+    again = save_changed_summaries(df)
+    assert again == {"files": 0, "rows": 0, "changed": 0, "skipped": slices}
+
+    edited = df.copy()
+    row = edited.index[(edited["Month"] == "February") & (edited["Name"] == "Employee 00002")][3]
+    edited.loc[row, "Work Time"] = 0
+    result = save_changed_summaries(edited)
+    assert result["changed"] == 1 and result["files"] == 1
+    summary = load_month_summary(2025, "February")
+    rows = summary[summary["Name"] == "Employee 00002"]
+    assert rows["ATT_Time"].iloc[3] == 0
+
+
+def test_missing_output_is_rewritten(backend):
+    df = load_attendance()
+    save_changed_summaries(df)
+    expected = load_month_summary(2025, "January")
+
+    _remove_output(backend, "Employee 00003", 2025, "January")
+    result = save_changed_summaries(df)
+    assert result["changed"] == 0 and result["files"] == 1
+    assert load_month_summary(2025, "January").equals(expected)
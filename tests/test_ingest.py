@@ -0,0 +1,74 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+from salarycalc import data, db
+from salarycalc.bench.synthetic import generate_dataset
+from salarycalc.data import ATTENDANCE_FILE, load_attendance
+from salarycalc.incremental import MANIFEST_FILE, save_changed_summaries
+from salarycalc.ingest import ingest_attendance_stream
+from salarycalc.store import load_month_summary, parquet_available
+
+BACKENDS = ["csv", "sqlite", pytest.param("parquet", marks=pytest.mark.skipif(
+    not parquet_available(), reason="pyarrow is not installed"))]
+
+
+@pytest.fixture(params=BACKENDS)
+def workdir(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SALARYCALC_STORE", request.param)
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "data" / "salarycalc.db"))
+    info = generate_dataset(str(tmp_path), employees=6, months=2)
+    os.replace(ATTENDANCE_FILE, "upload.csv")
+    data.invalidate()
+    yield info
+    data.invalidate()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _summaries(periods):
+    return {period: load_month_summary(*period) for period in periods}
+
+
+def test_failed_stream_keeps_previous_upload(workdir):
+    ingest_attendance_stream("upload.csv", chunksize=50)
+    attendance, manifest = _read(ATTENDANCE_FILE), _read(MANIFEST_FILE)
+    summaries = _summaries(workdir["periods"])
+
+    upload = pd.read_csv("upload.csv", dtype=str)
+    upload.loc[len(upload) - 1, "AC-No."] = "X"
+    upload.to_csv("bad.csv", index=False)
+    with pytest.raises(ValueError):
+        ingest_attendance_stream("bad.csv", chunksize=50)
+
+    assert _read(ATTENDANCE_FILE) == attendance
+    assert _read(MANIFEST_FILE) == manifest
+    for period, summary in _summaries(workdir["periods"]).items():
+        pd.testing.assert_frame_equal(summary, summaries[period])
+    assert not glob.glob("data/**/*.tmp", recursive=True)
+
+
+def test_chunked_stream_matches_single_read(workdir):
+    single = ingest_attendance_stream("upload.csv", chunksize=100_000)
+    attendance, manifest = _read(ATTENDANCE_FILE), _read(MANIFEST_FILE)
+    summaries = _summaries(workdir["periods"])
+
+    chunked = ingest_attendance_stream("upload.csv", chunksize=37)
+    assert chunked["chunks"] > 1 and chunked["rows"] == single["rows"] == workdir["attendance_rows"]
+    assert _read(ATTENDANCE_FILE) == attendance
+    assert _read(MANIFEST_FILE) == manifest
+    for period, summary in _summaries(workdir["periods"]).items():
+        pd.testing.assert_frame_equal(summary, summaries[period])
+
+    # A regular export of the same attendance finds nothing to rewrite
+    data.invalidate()
+    assert save_changed_summaries(load_attendance())["changed"] == 0
+    save_changed_summaries(load_attendance(), force=True)
+    for period, summary in _summaries(workdir["periods"]).items():
+        pd.testing.assert_frame_equal(summary, summaries[period])
@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+import pytest
+
+from salarycalc import data
+from salarycalc.data import HOLIDAY_COLS, HOLIDAY_FILE, compact_journal, journal_upsert, load_holidays
+from salarycalc.journal import read_changes
+from salarycalc.workcalendar import month_calendar
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SALARYCALC_STORE", raising=False)
+    os.makedirs("data")
+    pd.DataFrame([
+        ["2025-05-01", "MAY DAY", 2025, "May"],
+        ["2025-05-12", "VESAK", 2025, "May"],
+        ["2025-06-10", "POSON", 2025, "June"],
+    ], columns=HOLIDAY_COLS).to_csv(HOLIDAY_FILE, index=False)
+    data.invalidate()
+    yield tmp_path
+    data.invalidate()
+
+
+def _holiday(date, name):
+    date = pd.Timestamp(date)
+    return {"Holiday Date": date, "Holiday Name": name, "Year": date.year, "Month": date.month_name()}
+
+
+def test_holidays_survive_compaction(workdir):
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-20", "EXTRA"), _holiday("2025-05-12", "VESAK POYA")])
+    compact_journal(HOLIDAY_FILE)
+
+    assert not os.path.exists(HOLIDAY_FILE + ".journal")
+    with open(HOLIDAY_FILE) as f:
+        dates = [line.split(",")[0] for line in f.read().splitlines()[1:]]
+    assert dates == ["2025-05-01", "2025-05-12", "2025-06-10", "2025-06-20"]
+
+    holidays_df = load_holidays()
+    assert holidays_df["Holiday Date"].notna().all()
+    assert holidays_df["Holiday Name"].tolist() == ["MAY DAY", "VESAK POYA", "POSON", "EXTRA"]
+    assert pd.Timestamp("2025-06-20").date() in month_calendar(2025, "June", holidays_df)["holiday_dates"]
+
+
+def test_journal_applied_on_read_keeps_base_order(workdir):
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-05-01", "LABOUR DAY")])
+
+    holidays_df = load_holidays()
+    assert holidays_df["Holiday Name"].tolist() == ["LABOUR DAY", "VESAK", "POSON"]
+    assert pd.api.types.is_datetime64_any_dtype(holidays_df["Holiday Date"])
+
+
+def test_torn_append_keeps_later_edits(workdir):
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-20", "A")])
+    with open(HOLIDAY_FILE + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"op": "upsert", "key": ["2025-06-2')
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-21", "B")])
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-22", "C")])
+
+    assert [change["row"]["Holiday Name"] for change in read_changes(HOLIDAY_FILE + ".journal")] == ["A", "B", "C"]
+    compact_journal(HOLIDAY_FILE)
+    assert load_holidays()["Holiday Name"].tolist()[-3:] == ["A", "B", "C"]
+
+
+def test_unreadable_line_is_skipped(workdir):
+    journal = HOLIDAY_FILE + ".journal"
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-20", "A")])
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-21", "B")])
+
+    assert [change["row"]["Holiday Name"] for change in read_changes(journal)] == ["A", "B"]
+
+
+def test_compaction_between_journal_and_base_read(workdir, monkeypatch):
+    journal_upsert(HOLIDAY_FILE, [_holiday("2025-06-20", "EXTRA")])
+    real_read = data.cached_read
+    compacted = []
+
+    def read_then_compact(path, parse):
+        result = real_read(path, parse)
+        if path.endswith(".journal") and not compacted:
+            compacted.append(path)
+            compact_journal(HOLIDAY_FILE)
+        return result
+
+    monkeypatch.setattr(data, "cached_read", read_then_compact)
+    assert load_holidays()["Holiday Name"].tolist() == ["MAY DAY", "VESAK", "POSON", "EXTRA"]
+    assert not os.path.exists(HOLIDAY_FILE + ".journal")
+    assert read_changes(HOLIDAY_FILE + ".journal") == []
@@ -0,0 +1,91 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salarycalc import data
+from salarycalc.bench.synthetic import generate_dataset
+from salarycalc.data import load_attendance, load_deductions, load_employees, load_holidays
+from salarycalc.export import summary_path
+from salarycalc.incremental import save_changed_summaries
+from salarycalc.payroll import FIXED_SALARY_TYPES, compute_payroll
+from salarycalc.store import load_month_summary
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("SALARYCALC_STORE", raising=False)
+    info = generate_dataset(str(tmp_path), employees=40, months=2, start_month=5, seed=3)
+    data.invalidate()
+    save_changed_summaries(load_attendance())
+    yield info
+    data.invalidate()
+
+
+def baseline_salary(emp, employee_df, deduction_df, holidays_df, year, month):
+    """Gross and net pay for one employee, as the original Salary Calculation page computed them."""
+    summary_df = pd.read_csv(summary_path(emp, year, month), parse_dates=["Date"])
+    summary_df['Day'] = summary_df['Day'].astype(str)
+    real_day = summary_df['RND(ATT_Time)'].apply(lambda att: 1.0 if att > 6.5 else 0.5 if att > 0 else 0.0)
+    sunday = summary_df['Day'].str.lower() == 'sunday'
+    weekday_full = (~sunday & (real_day == 1.0)).sum()
+    weekday_half = (~sunday & (real_day == 0.5)).sum()
+    sunday_full = (sunday & (real_day == 1.0)).sum()
+    sunday_half = (sunday & (real_day == 0.5)).sum()
+    weekday_overtime = summary_df[~sunday]['OT Time'].sum()
+
+    month_holidays = holidays_df[(holidays_df['Year'] == year) & (holidays_df['Month'] == month)]
+    holiday_dates = set(month_holidays['Holiday Date'].dt.date.dropna())
+
+    emp_data = employee_df[employee_df["Employee Name"] == emp].iloc[0]
+    epf_8 = round(emp_data["Salary for EPF"] * 0.08, 2)
+
+    month_num = list(calendar.month_name).index(month)
+    all_dates = pd.date_range(f"{year}-{month_num:02d}-01", periods=calendar.monthrange(year, month_num)[1])
+    total_weekdays = len(all_dates) - sum(1 for d in all_dates if d.day_name() == "Sunday")
+    weekday_holidays = sum(1 for d in holiday_dates if pd.to_datetime(d).day_name() not in ["Saturday", "Sunday"])
+    bonus_threshold = total_weekdays - weekday_holidays - 2
+    bonus = emp_data["Attendance Bonus"] if weekday_full >= bonus_threshold else 0
+
+    emp_deductions = deduction_df[
+        (deduction_df["Employee Name"] == emp) & (deduction_df["Year"] == year) & (deduction_df["Month"] == month)
+    ]
+    advance = emp_deductions["Monthly Advanced"].values[0] if not emp_deductions.empty else 0
+    loan = emp_deductions["Monthly Loan Deduction"].values[0] if not emp_deductions.empty else 0
+
+    normal_rate = emp_data["Normal Pay Rate"]
+    sunday_rate = emp_data["Sunday Pay Rate"]
+    base_salary = weekday_full * normal_rate + weekday_half * normal_rate / 2
+    sunday_pay = sunday_full * sunday_rate + sunday_half * sunday_rate / 2
+    ot_pay = weekday_overtime * emp_data["Overtime Pay Hourly Rate"]
+    gross = base_salary + ot_pay + sunday_pay + bonus + emp_data["Other Allowances"] + emp_data["Meal Allowance"]
+    if emp_data["Employee Type"] in FIXED_SALARY_TYPES:
+        gross = (emp_data["Basic Salary"] + emp_data["BRA"] + emp_data["Attendance Bonus"]
+                 + emp_data["Other Allowances"] + emp_data["Meal Allowance"])
+    return gross, gross - advance - loan - epf_8
+
+
+def test_payroll_matches_original_salary_page(workdir):
+    employee_df, deduction_df, holidays_df = load_employees(), load_deductions(), load_holidays()
+    for year, month in workdir["periods"]:
+        month_summary = load_month_summary(year, month)
+        payroll = compute_payroll(employee_df, month_summary, deduction_df, holidays_df, year, month)
+        assert payroll["Has Summary"].all()
+
+        expected = pd.DataFrame(
+            [baseline_salary(emp, employee_df, deduction_df, holidays_df, year, month)
+             for emp in payroll["Employee Name"]],
+            columns=["Gross Salary", "Net Salary"],
+        )
+        np.testing.assert_allclose(payroll["Gross Salary"], expected["Gross Salary"])
+        np.testing.assert_allclose(payroll["Net Salary"], expected["Net Salary"])
+
+        # The month exercises every rule the formulas branch on
+        month_deductions = deduction_df[(deduction_df["Year"] == year) & (deduction_df["Month"] == month)]
+        assert (~payroll["Attendance Paid"]).any() and payroll["Attendance Paid"].any()
+        assert (payroll["Half Days"] > 0).any() and (payroll["Sunday Full"] > 0).any()
+        assert (payroll["Bonus"] == 0).any() and (payroll["Bonus"] > 0).any()
+        assert not payroll["Employee Name"].isin(month_deductions["Employee Name"]).all()
+        assert (holidays_df["Month"] == month).any()